@@ -15,18 +15,31 @@ It does NOT:
 - modify SSB logic
 
 This script is strictly explanatory.
+
+Batch / headless use:
+- --out FILE renders to an image file with a non-interactive backend
+- --batch DIR renders every Phase III run under DIR (one image per run folder)
+  in parallel worker processes (--workers)
+
+Only state transitions are kept for plotting (plus the final step), so the
+step plot is identical to plotting every row while memory stays bounded by
+the number of transitions, not the number of rows.
 """
 
+import argparse
 import csv
 import sys
 import os
-import matplotlib.pyplot as plt
 
 # --- Mandatory label (do not remove) ---
 DISCLAIMER = "Illustrative only — no quantitative inference permitted."
 
-# --- Expected CSV name ---
+# --- Expected CSV name (plain, or compressed as written by --compress) ---
 EXPECTED_CSV = "phase3_classification.csv"
+CSV_NAMES = [EXPECTED_CSV, EXPECTED_CSV + ".gz", EXPECTED_CSV + ".zst"]
+
+# --- Batch output name (written next to each Phase III CSV) ---
+BATCH_PNG = "ssb_illustrative_governance_plot.png"
 
 # --- Map envelopes to symbolic levels (non-quantitative) ---
 LEVEL_MAP = {
@@ -45,56 +58,82 @@ LABEL_MAP = {
 def resolve_csv_path(path):
     """
     Accepts either:
-    - direct path to phase3_classification.csv
-    - directory containing phase3_classification.csv
+    - direct path to phase3_classification.csv (or .csv.gz / .csv.zst)
+    - directory containing phase3_classification.csv (or .csv.gz / .csv.zst)
     """
     if os.path.isfile(path):
         return path
 
     if os.path.isdir(path):
-        candidate = os.path.join(path, EXPECTED_CSV)
-        if os.path.isfile(candidate):
-            return candidate
+        for name in CSV_NAMES:
+            candidate = os.path.join(path, name)
+            if os.path.isfile(candidate):
+                return candidate
 
     return None
 
-def main(input_path):
-    csv_path = resolve_csv_path(input_path)
-
-    if csv_path is None:
-        print("ERROR: Could not locate Phase III classification CSV.")
-        print()
-        print("Expected one of the following:")
-        print("  1) Direct path to phase3_classification.csv")
-        print("  2) Directory containing phase3_classification.csv")
-        print()
-        print("Provided path:")
-        print(f"  {input_path}")
-        sys.exit(1)
-
+def open_csv(csv_path):
+    """
+    Open the CSV for streaming text reads; .gz / .zst are decompressed on the fly.
+    """
+    if csv_path.endswith(".gz"):
+        import gzip
+        return gzip.open(csv_path, "rt", newline="", encoding="utf-8")
+    if csv_path.endswith(".zst"):
+        import io
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading .zst files needs the 'zstandard' package (pip install zstandard).")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(csv_path, "rb"), closefd=True)
+        return io.TextIOWrapper(io.BufferedReader(stream), newline="", encoding="utf-8")
+    return open(csv_path, newline="", encoding="utf-8")
+
+def read_transitions(csv_path):
+    """
+    Stream the CSV and keep only the steps where the governance level changes,
+    plus the last valid step. Raises ValueError with a user-facing message.
+    """
     steps = []
     levels = []
+    last = None
 
-    with open(csv_path, newline="", encoding="utf-8") as f:
+    with open_csv(csv_path) as f:
         reader = csv.DictReader(f)
 
-        if "PHASE3_envelope" not in reader.fieldnames:
-            print("ERROR: CSV does not contain required column 'PHASE3_envelope'")
-            print("Found columns:", reader.fieldnames)
-            sys.exit(1)
+        if "PHASE3_envelope" not in (reader.fieldnames or []):
+            raise ValueError("CSV does not contain required column 'PHASE3_envelope'\n"
+                             f"Found columns: {reader.fieldnames}")
 
         for i, row in enumerate(reader):
             env = (row.get("PHASE3_envelope") or "").strip()
             if env in LEVEL_MAP:
-                steps.append(i)
-                levels.append(LEVEL_MAP[env])
+                level = LEVEL_MAP[env]
+                if not levels or level != levels[-1]:
+                    steps.append(i)
+                    levels.append(level)
+                last = i
 
     if not steps:
-        print("ERROR: No valid governance states found in CSV.")
-        sys.exit(1)
+        raise ValueError("No valid governance states found in CSV.")
+
+    # Keep the final step so the plot extends to the last evaluated row
+    if last != steps[-1]:
+        steps.append(last)
+        levels.append(levels[-1])
+
+    return steps, levels
+
+def render(csv_path, out_path=None):
+    import matplotlib
+    if out_path:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    steps, levels = read_transitions(csv_path)
 
     # --- Plot ---
-    plt.figure(figsize=(10, 4))
+    fig = plt.figure(figsize=(10, 4))
     plt.step(steps, levels, where="post", linewidth=2)
 
     plt.yticks([0, 1, 2], [LABEL_MAP[0], LABEL_MAP[1], LABEL_MAP[2]])
@@ -108,12 +147,85 @@ def main(input_path):
     plt.figtext(0.5, -0.18, DISCLAIMER, ha="center", fontsize=9, style="italic")
 
     plt.tight_layout()
-    plt.show()
-
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
+    if out_path:
+        fig.savefig(out_path, bbox_inches="tight")
+        plt.close(fig)
+    else:
+        plt.show()
+
+def find_phase3_csvs(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in CSV_NAMES:
+            if name in filenames:
+                yield os.path.join(dirpath, name)
+                break
+
+def render_job(csv_path):
+    out_path = os.path.join(os.path.dirname(csv_path), BATCH_PNG)
+    try:
+        render(csv_path, out_path)
+    except ValueError as e:
+        return csv_path, None, str(e)
+    return csv_path, out_path, None
+
+def run_batch(root, workers):
+    from concurrent.futures import ProcessPoolExecutor
+
+    n_ok = n_err = 0
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as ex:
+        for csv_path, out_path, err in ex.map(render_job, find_phase3_csvs(root), chunksize=4):
+            if err is None:
+                n_ok += 1
+                print("OK:", out_path)
+            else:
+                n_err += 1
+                print("ERROR:", csv_path)
+                print("  " + err.replace("\n", "\n  "))
+    print(f"Rendered: {n_ok}  Failed: {n_err}")
+    print(DISCLAIMER)
+    return n_err == 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Illustrative governance-state plot from an existing Phase III CSV. " + DISCLAIMER)
+    ap.add_argument("input", nargs="?", help="phase3_classification.csv or a directory containing it.")
+    ap.add_argument("--out", default="", help="Render to this image file (headless) instead of showing a window.")
+    ap.add_argument("--batch", default="", help="Render every Phase III run under this directory (headless).")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Batch mode worker processes.")
+    args = ap.parse_args(argv)
+
+    if args.batch:
+        sys.exit(0 if run_batch(args.batch, args.workers) else 1)
+
+    if not args.input:
         print("Usage:")
-        print("  python ssb_illustrative_governance_plot.py <csv_or_directory>")
+        print("  python ssb_illustrative_governance_plot.py <csv_or_directory> [--out FILE]")
+        print("  python ssb_illustrative_governance_plot.py --batch <directory> [--workers N]")
+        sys.exit(1)
+
+    input_path = args.input
+    csv_path = resolve_csv_path(input_path)
+
+    if csv_path is None:
+        print("ERROR: Could not locate Phase III classification CSV.")
+        print()
+        print("Expected one of the following:")
+        print("  1) Direct path to phase3_classification.csv")
+        print("  2) Directory containing phase3_classification.csv")
+        print()
+        print("Provided path:")
+        print(f"  {input_path}")
+        sys.exit(1)
+
+    try:
+        render(csv_path, args.out or None)
+    except ValueError as e:
+        print("ERROR: " + str(e))
         sys.exit(1)
 
-    main(sys.argv[1])
+    if args.out:
+        print("OK:", args.out)
+
+if __name__ == "__main__":
+    main()
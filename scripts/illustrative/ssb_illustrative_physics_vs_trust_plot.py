@@ -22,15 +22,26 @@ It does NOT:
 Input:
 - A direct path to phase3_classification.csv, OR
 - A directory containing phase3_classification.csv
+(.csv.gz / .csv.zst forms are read transparently, streaming)
+
+Batch / headless use:
+- --out FILE renders to an image file with a non-interactive backend
+- --batch DIR renders every Phase III run under DIR in parallel worker processes
+- --max_points N downsamples each curve with LTTB (largest-triangle-three-buckets)
+  so multi-million-row runs render quickly while keeping their visual shape.
+  The first RESTRICTED / DENY markers are always taken from the full data.
 """
 
+import argparse
+import array
 import csv
 import os
 import sys
-import matplotlib.pyplot as plt
 
 DISCLAIMER = "Illustrative only — no quantitative inference permitted."
 EXPECTED_CSV = "phase3_classification.csv"
+CSV_NAMES = [EXPECTED_CSV, EXPECTED_CSV + ".gz", EXPECTED_CSV + ".zst"]
+BATCH_PNG = "ssb_illustrative_physics_vs_trust_plot.png"
 
 ENV_COL_CANDIDATES = ["PHASE3_envelope", "phase3_envelope", "envelope_class", "phase3_status", "phase2_status"]
 GM_COL_CANDIDATES  = ["GM_eff", "GM_EFF", "gm_eff"]
@@ -39,17 +50,36 @@ S_COL_CANDIDATES   = ["s", "S", "s_t", "S_t", "structural_resistance"]
 RESTRICT_STATE = "ALLOW_RESTRICTED_MONITOR"
 DENY_STATE     = "DENY_FINAL"
 
+DEFAULT_MAX_POINTS = 5000
+
 
 def resolve_csv_path(path: str) -> str | None:
     if os.path.isfile(path):
         return path
     if os.path.isdir(path):
-        candidate = os.path.join(path, EXPECTED_CSV)
-        if os.path.isfile(candidate):
-            return candidate
+        for name in CSV_NAMES:
+            candidate = os.path.join(path, name)
+            if os.path.isfile(candidate):
+                return candidate
     return None
 
 
+def open_csv(csv_path: str):
+    # Streaming text reader; .gz / .zst are decompressed on the fly
+    if csv_path.endswith(".gz"):
+        import gzip
+        return gzip.open(csv_path, "rt", newline="", encoding="utf-8")
+    if csv_path.endswith(".zst"):
+        import io
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading .zst files needs the 'zstandard' package (pip install zstandard).")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(csv_path, "rb"), closefd=True)
+        return io.TextIOWrapper(io.BufferedReader(stream), newline="", encoding="utf-8")
+    return open(csv_path, newline="", encoding="utf-8")
+
+
 def pick_column(fieldnames, candidates):
     for c in candidates:
         if c in fieldnames:
@@ -69,21 +99,50 @@ def parse_float(x):
         return None
 
 
-def main(input_path: str):
-    csv_path = resolve_csv_path(input_path)
-    if csv_path is None:
-        print("ERROR: Could not locate Phase III classification CSV.")
-        print("Expected one of:")
-        print("  1) Direct path to phase3_classification.csv")
-        print("  2) Directory containing phase3_classification.csv")
-        print("Provided:", input_path)
-        sys.exit(1)
-
-    with open(csv_path, newline="", encoding="utf-8") as f:
+def lttb(xs, ys, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the indices of the retained points (always includes first and last).
+    """
+    n = len(xs)
+    if n_out >= n or n_out < 3:
+        return range(n)
+
+    every = (n - 2) / (n_out - 2)
+    keep = [0]
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        cnt = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / cnt
+        avg_y = sum(ys[avg_start:avg_end]) / cnt
+
+        # Point in this bucket forming the largest triangle with a and the average
+        ax, ay = xs[a], ys[a]
+        best = int(i * every) + 1
+        best_area = -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def load_series(csv_path):
+    """
+    Stream the CSV into compact arrays. Raises ValueError with a user-facing message.
+    Returns (columns_used, steps, gm_vals, s_vals, first_restrict_step, first_deny_step).
+    """
+    with open_csv(csv_path) as f:
         reader = csv.DictReader(f)
         if not reader.fieldnames:
-            print("ERROR: CSV has no header / fieldnames.")
-            sys.exit(1)
+            raise ValueError("CSV has no header / fieldnames.")
 
         env_col = pick_column(reader.fieldnames, ENV_COL_CANDIDATES)
         gm_col  = pick_column(reader.fieldnames, GM_COL_CANDIDATES)
@@ -98,18 +157,19 @@ def main(input_path: str):
             missing.append("s column (one of " + ", ".join(S_COL_CANDIDATES) + ")")
 
         if missing:
-            print("ERROR: Missing required column(s):")
-            for m in missing:
-                print("  -", m)
-            print("\nFound columns:")
-            for name in reader.fieldnames:
-                print("  -", name)
-            sys.exit(1)
-
-        steps = []
-        gm_vals = []
-        s_vals = []
-        env_vals = []
+            msg = ["Missing required column(s):"]
+            msg += ["  - " + m for m in missing]
+            msg += ["", "Found columns:"]
+            msg += ["  - " + name for name in reader.fieldnames]
+            raise ValueError("\n".join(msg))
+
+        steps = array.array("q")
+        gm_vals = array.array("d")
+        s_vals = array.array("d")
+
+        # First transition indices (within plotted steps)
+        first_restrict_step = None
+        first_deny_step = None
 
         for i, row in enumerate(reader):
             gm = parse_float(row.get(gm_col))
@@ -123,28 +183,36 @@ def main(input_path: str):
             steps.append(i)
             gm_vals.append(gm)
             s_vals.append(ss)
-            env_vals.append(env)
+
+            if first_restrict_step is None and env == RESTRICT_STATE:
+                first_restrict_step = i
+            if first_deny_step is None and env == DENY_STATE:
+                first_deny_step = i
 
     if not steps:
-        print("ERROR: No usable rows found (need numeric GM_eff and s).")
-        sys.exit(1)
+        raise ValueError("No usable rows found (need numeric GM_eff and s).")
 
-    # Find first transition indices (within plotted steps)
-    first_restrict_step = None
-    first_deny_step = None
+    cols = {"envelope": env_col, "GM_eff": gm_col, "s": s_col}
+    return cols, steps, gm_vals, s_vals, first_restrict_step, first_deny_step
 
-    for i, env in enumerate(env_vals):
-        if first_restrict_step is None and env == RESTRICT_STATE:
-            first_restrict_step = steps[i]
-        if first_deny_step is None and env == DENY_STATE:
-            first_deny_step = steps[i]
-        if first_restrict_step is not None and first_deny_step is not None:
-            break
+
+def render(csv_path, out_path=None, max_points=DEFAULT_MAX_POINTS):
+    import matplotlib
+    if out_path:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    cols, steps, gm_vals, s_vals, first_restrict_step, first_deny_step = load_series(csv_path)
+
+    keep_gm = lttb(steps, gm_vals, max_points) if max_points else range(len(steps))
+    keep_s = lttb(steps, s_vals, max_points) if max_points else range(len(steps))
 
     # Plot
-    plt.figure(figsize=(11, 4.5))
-    plt.plot(steps, gm_vals, linewidth=2, label="GM_eff(t) (classical stability signal)")
-    plt.plot(steps, s_vals, linewidth=2, label="s(t) (structural resistance accumulation)")
+    fig = plt.figure(figsize=(11, 4.5))
+    plt.plot([steps[k] for k in keep_gm], [gm_vals[k] for k in keep_gm], linewidth=2,
+             label="GM_eff(t) (classical stability signal)")
+    plt.plot([steps[k] for k in keep_s], [s_vals[k] for k in keep_s], linewidth=2,
+             label="s(t) (structural resistance accumulation)")
 
     # Vertical markers
     if first_restrict_step is not None:
@@ -163,20 +231,99 @@ def main(input_path: str):
     plt.figtext(0.5, 0.01, DISCLAIMER, ha="center", fontsize=9, style="italic")
 
     plt.tight_layout()
-    plt.show()
+    if out_path:
+        fig.savefig(out_path, bbox_inches="tight")
+        plt.close(fig)
+    else:
+        plt.show()
+
+    return cols, first_restrict_step, first_deny_step
+
+
+def find_phase3_csvs(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in CSV_NAMES:
+            if name in filenames:
+                yield os.path.join(dirpath, name)
+                break
+
+
+def render_job(job):
+    csv_path, max_points = job
+    out_path = os.path.join(os.path.dirname(csv_path), BATCH_PNG)
+    try:
+        render(csv_path, out_path, max_points)
+    except ValueError as e:
+        return csv_path, None, str(e)
+    return csv_path, out_path, None
+
+
+def run_batch(root, workers, max_points):
+    from concurrent.futures import ProcessPoolExecutor
+
+    n_ok = n_err = 0
+    jobs = ((p, max_points) for p in find_phase3_csvs(root))
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as ex:
+        for csv_path, out_path, err in ex.map(render_job, jobs, chunksize=4):
+            if err is None:
+                n_ok += 1
+                print("OK:", out_path)
+            else:
+                n_err += 1
+                print("ERROR:", csv_path)
+                print("  " + err.replace("\n", "\n  "))
+    print(f"Rendered: {n_ok}  Failed: {n_err}")
+    print(DISCLAIMER)
+    return n_err == 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Figure D.2 — physical stability vs structural trust (illustrative). " + DISCLAIMER)
+    ap.add_argument("input", nargs="?", help="phase3_classification.csv or a directory containing it.")
+    ap.add_argument("--out", default="", help="Render to this image file (headless) instead of showing a window.")
+    ap.add_argument("--batch", default="", help="Render every Phase III run under this directory (headless).")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Batch mode worker processes.")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS,
+                    help="LTTB point budget per curve (0 = plot every row).")
+    args = ap.parse_args(argv)
+
+    if args.batch:
+        sys.exit(0 if run_batch(args.batch, args.workers, args.max_points) else 1)
+
+    if not args.input:
+        print("Usage:")
+        print("  python ssb_illustrative_physics_vs_trust_plot.py <csv_or_directory> [--out FILE]")
+        print("  python ssb_illustrative_physics_vs_trust_plot.py --batch <directory> [--workers N]")
+        sys.exit(1)
+
+    input_path = args.input
+    csv_path = resolve_csv_path(input_path)
+    if csv_path is None:
+        print("ERROR: Could not locate Phase III classification CSV.")
+        print("Expected one of:")
+        print("  1) Direct path to phase3_classification.csv")
+        print("  2) Directory containing phase3_classification.csv")
+        print("Provided:", input_path)
+        sys.exit(1)
+
+    try:
+        cols, first_restrict_step, first_deny_step = render(csv_path, args.out or None, args.max_points)
+    except ValueError as e:
+        print("ERROR: " + str(e))
+        sys.exit(1)
 
     # Console summary (helpful for docs)
-    print("OK: Figure D.2 plot displayed.")
+    if args.out:
+        print("OK: Figure D.2 plot written:", args.out)
+    else:
+        print("OK: Figure D.2 plot displayed.")
     print("CSV:", csv_path)
-    print("Columns used:", {"envelope": env_col, "GM_eff": gm_col, "s": s_col})
+    print("Columns used:", cols)
     print("First RESTRICTED step:", first_restrict_step)
     print("First DENY step:", first_deny_step)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage:")
-        print("  python ssb_illustrative_physics_vs_trust_plot.py <csv_or_directory>")
-        sys.exit(1)
-
-    main(sys.argv[1])
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+SSB unified command line.
+
+  python scripts/ssb.py <command> [args...]
+
+Each command forwards its arguments unchanged to the matching script's main().
+Only the module for the chosen command is imported, so startup cost is that of
+the one script being run.
+"""
+
+import importlib
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ILLUSTRATIVE_DIR = os.path.join(SCRIPT_DIR, "illustrative")
+
+# command -> (module, extra sys.path entry, one-line help)
+COMMANDS = {
+    "sweep": ("ssb_disp_sweep", None, "Displacement sweep (Phase II)."),
+    "ladder": ("ssb_multifsc_ladder", None, "Multi-tank FSC ladder (Phase II)."),
+    "cyclic": ("ssb_cyclic_fatigue", None, "Cyclic fatigue, single vessel or fleet (Phase II)."),
+    "limits": ("ssb_limit_curves", None, "Allowable KG / FSC limit curves over a displacement grid."),
+    "phase3": ("ssb_phase3_envelope", None, "Phase III envelope classification of a Phase II CSV."),
+    "diff": ("ssb_diff", None, "First divergence and per-column max deltas between two runs."),
+    "stats": ("ssb_stats", None, "Cross-run statistics with mergeable quantile sketches."),
+    "catalog": ("ssb_catalog", None, "SQLite run catalog (backfill / query)."),
+    "cache": ("ssb_cache", None, "Inspect or trim a result cache."),
+    "backends": ("ssb_backend", None, "List compute backends and cross-verify them."),
+}
+
+PLOTS = {
+    "governance": ("ssb_illustrative_governance_plot", ILLUSTRATIVE_DIR, "Governance state timeline."),
+    "physics": ("ssb_illustrative_physics_vs_trust_plot", ILLUSTRATIVE_DIR, "Physics vs trust overlay."),
+}
+
+def usage():
+    lines = ["usage: ssb.py <command> [args...]", "", "commands:"]
+    for name, (_, _, text) in COMMANDS.items():
+        lines.append(f"  {name:<10} {text}")
+    lines.append(f"  {'plot':<10} Illustrative plots: plot {{{','.join(PLOTS)}}} [args...]")
+    lines.append("")
+    lines.append("Run 'ssb.py <command> --help' for the command's own options.")
+    return "\n".join(lines)
+
+def resolve(argv):
+    # Returns (module, path, remaining argv) or raises SystemExit with usage.
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        raise SystemExit(0 if argv else 2)
+
+    cmd, rest = argv[0], argv[1:]
+    if cmd == "plot":
+        if not rest or rest[0] not in PLOTS:
+            raise SystemExit(f"ERROR: plot needs one of: {', '.join(PLOTS)}")
+        module, path, _ = PLOTS[rest[0]]
+        return module, path, rest[1:]
+    if cmd not in COMMANDS:
+        raise SystemExit(f"ERROR: unknown command '{cmd}'.\n\n{usage()}")
+    module, path, _ = COMMANDS[cmd]
+    return module, path, rest
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    module, path, rest = resolve(argv)
+    if path and path not in sys.path:
+        sys.path.insert(0, path)
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    return importlib.import_module(module).main(rest)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+SSB compute backends: the same deterministic kernels in pure Python, NumPy or
+a JIT (numba), chosen by problem size.
+
+Kernels (one set per backend; arrays are the backend's own type, tolist()
+turns them into Python lists for CSV rows):
+
+  base(I_T, disp_vol, KB, KG)                      -> BM, KM, GM  (NaN where invalid)
+  delta(t0, t1, mode, amp, period, duty)           -> delta(t) for ticks [t0, t1)
+  gate(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max)
+                                                   -> GM_eff, a, r, s, status codes
+  summary(...same as gate...)                      -> (n_allow, n_deny, n_abstain,
+                                                       first_deny, min_GM_eff, max_s, s_end)
+  envelope(status, a, s, a_min, s_max, s_warn_frac)  -> Phase III label codes
+
+gate is the ssb_gate accumulator over a block of ticks: s starts at s0 and
+carries across calls, ABSTAIN turns s into NaN exactly as the scalar loop does.
+Status codes index STATUS_NAMES, label codes index PHASE3_LABELS.
+
+Selection:
+  --backend auto     the fastest available backend for the problem size (AUTO_ORDER)
+  --backend NAME     that backend; exits with a hint if its package is missing
+
+python is the reference and always available; numpy and jit are optional.
+All backends give the same statuses, labels and first-hit indices:
+
+  python scripts/ssb_backend.py verify
+  python scripts/ssb_backend.py list
+"""
+
+import argparse
+import math
+import sys
+import types
+
+from ssb_phase3_envelope import PHASE3_LABELS, envelope_label
+
+EPS = 1e-12
+
+STATUS_NAMES = ["ALLOW", "DENY", "ABSTAIN"]
+ALLOW, DENY, ABSTAIN = 0, 1, 2
+LABEL_CODE = {name: k for k, name in enumerate(PHASE3_LABELS)}
+NORMAL = LABEL_CODE["ALLOW_NORMAL"]
+RESTRICTED = LABEL_CODE["ALLOW_RESTRICTED_MONITOR"]
+DENY_FINAL = LABEL_CODE["DENY_FINAL"]
+REVIEW = LABEL_CODE["ABSTAIN_HUMAN_REVIEW"]
+
+# Auto-selection: the first available backend whose minimum size is reached.
+# Sizes are gate evaluations (ticks, or vessels x ticks); the JIT pays a
+# one-off compile, NumPy a per-call overhead.
+AUTO_ORDER = [("jit", 10_000_000), ("numpy", 10_000), ("python", 0)]
+
+PACKAGES = {"python": None, "numpy": "numpy", "jit": "numba"}
+
+# --- python (reference) ---
+
+def is_finite(x):
+    return isinstance(x, (int, float)) and math.isfinite(x)
+
+def clamp01(x):
+    if x < 0.0:
+        return 0.0
+    if x > 1.0:
+        return 1.0
+    return x
+
+def py_base(I_T, disp_vol, KB, KG):
+    nan = float("nan")
+    BM, KM, GM = [], [], []
+    for i, d, kb, kg in zip(I_T, disp_vol, KB, KG):
+        if not (is_finite(i) and is_finite(d) and is_finite(kb) and is_finite(kg)) or d <= 0.0 or i <= 0.0:
+            BM.append(nan)
+            KM.append(nan)
+            GM.append(nan)
+            continue
+        bm = i / d
+        km = kb + bm
+        BM.append(bm)
+        KM.append(km)
+        GM.append(km - kg)
+    return BM, KM, GM
+
+def py_delta(t0, t1, mode, amp, period, duty):
+    out = []
+    for t in range(t0, t1):
+        if mode == "square":
+            phase = (t % period) / float(period)
+            out.append(amp if phase < duty else 0.0)
+        elif mode == "sine_abs":
+            out.append(amp * abs(math.sin(2.0 * math.pi * (t / float(period)))))
+        elif mode == "ramp":
+            phase = (t % period) / float(period)
+            out.append(amp * phase)
+        else:
+            out.append(amp)
+    return out
+
+def py_gate(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max):
+    nan = float("nan")
+    g = max(GM_safe, EPS)
+    E, A, R, S, ST = [], [], [], [], []
+    s = s0
+    for d in delta:
+        e = GM - FSC - d
+        margin = e / g
+        a = clamp01(margin)
+        r = max(0.0, 1.0 - margin)
+        s = s + max(0.0, r - r_safe)
+        if not is_finite(e):
+            a = r = s = nan
+            st = ABSTAIN
+        elif e <= 0.0 or a < a_min or s > s_max:
+            st = DENY
+        else:
+            st = ALLOW
+        E.append(e)
+        A.append(a)
+        R.append(r)
+        S.append(s)
+        ST.append(st)
+    return E, A, R, S, ST
+
+def py_summary(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max):
+    E, A, R, S, ST = py_gate(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max)
+    counts = [0, 0, 0]
+    first = None
+    min_e = math.inf
+    max_s = -math.inf
+    for k, (e, s, st) in enumerate(zip(E, S, ST)):
+        counts[st] += 1
+        if st == DENY and first is None:
+            first = (k, e, s)
+        if e < min_e:
+            min_e = e
+        if s > max_s:
+            max_s = s
+    return counts[ALLOW], counts[DENY], counts[ABSTAIN], first, min_e, max_s, (S[-1] if S else s0)
+
+def py_envelope(status, a, s, a_min, s_max, s_warn_frac):
+    return [LABEL_CODE[envelope_label(STATUS_NAMES[st], x, y, a_min, s_max, s_warn_frac)]
+            for st, x, y in zip(status, a, s)]
+
+def load_python():
+    return types.SimpleNamespace(name="python", base=py_base, delta=py_delta, gate=py_gate,
+                                 summary=py_summary, envelope=py_envelope, tolist=list)
+
+# --- numpy ---
+# Python's max(0.0, x) is "x if x > 0.0 else 0.0" and clamp01 keeps NaN;
+# np.where reproduces both exactly (np.maximum would not). The running sum is
+# np.cumsum, a sequential left-to-right fold like the scalar loop.
+
+def load_numpy():
+    import numpy as np
+
+    def base(I_T, disp_vol, KB, KG):
+        I_T, disp_vol, KB, KG = (np.asarray(x, dtype=np.float64) for x in (I_T, disp_vol, KB, KG))
+        ok = np.isfinite(I_T) & np.isfinite(disp_vol) & np.isfinite(KB) & np.isfinite(KG)
+        ok &= (disp_vol > 0.0) & (I_T > 0.0)
+        with np.errstate(all="ignore"):
+            BM = np.where(ok, I_T / disp_vol, np.nan)
+        KM = KB + BM
+        return BM, KM, KM - KG
+
+    def delta(t0, t1, mode, amp, period, duty):
+        t = np.arange(t0, t1, dtype=np.int64)
+        if mode == "square":
+            return np.where((t % period) / float(period) < duty, amp, 0.0)
+        if mode == "sine_abs":
+            return amp * np.abs(np.sin(2.0 * math.pi * (t / float(period))))
+        if mode == "ramp":
+            return amp * ((t % period) / float(period))
+        return np.full(t.shape, amp, dtype=np.float64)
+
+    def gate(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max):
+        E = GM - FSC - np.asarray(delta, dtype=np.float64)
+        with np.errstate(all="ignore"):
+            margin = E / max(GM_safe, EPS)
+            A = np.where(margin < 0.0, 0.0, np.where(margin > 1.0, 1.0, margin))
+            x = 1.0 - margin
+            R = np.where(x > 0.0, x, 0.0)
+            y = R - r_safe
+            inc = np.where(y > 0.0, y, 0.0)
+            bad = ~np.isfinite(E)
+            A[bad] = R[bad] = inc[bad] = np.nan
+            S = np.cumsum(np.concatenate(([s0], inc)))[1:]
+            deny = (E <= 0.0) | (A < a_min) | (S > s_max)
+        ST = np.where(bad, ABSTAIN, np.where(deny, DENY, ALLOW)).astype(np.int8)
+        return E, A, R, S, ST
+
+    def summary(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max):
+        E, A, R, S, ST = gate(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max)
+        counts = np.bincount(ST, minlength=3)
+        hits = np.flatnonzero(ST == DENY)
+        first = None if hits.size == 0 else (int(hits[0]), float(E[hits[0]]), float(S[hits[0]]))
+        # NaN never wins a strict comparison in the scalar loop; fmin / fmax skip it too
+        min_e = float(np.fmin.reduce(E, initial=math.inf)) if E.size else math.inf
+        max_s = float(np.fmax.reduce(S, initial=-math.inf)) if S.size else -math.inf
+        s_end = float(S[-1]) if S.size else s0
+        return int(counts[ALLOW]), int(counts[DENY]), int(counts[ABSTAIN]), first, min_e, max_s, s_end
+
+    def envelope(status, a, s, a_min, s_max, s_warn_frac):
+        status = np.asarray(status)
+        a = np.asarray(a, dtype=np.float64)
+        s = np.asarray(s, dtype=np.float64)
+        ok = (status == ALLOW) & np.isfinite(a) & np.isfinite(s)
+        restricted = (s >= s_warn_frac * s_max) | (a <= a_min + 0.05)
+        out = np.where(status == DENY, DENY_FINAL, REVIEW)
+        out = np.where(ok, np.where(restricted, RESTRICTED, NORMAL), out)
+        return out.astype(np.int8)
+
+    return types.SimpleNamespace(name="numpy", base=base, delta=delta, gate=gate,
+                                 summary=summary, envelope=envelope, tolist=lambda x: x.tolist())
+
+# --- jit (numba) ---
+# The scalar loops compiled once per process; array setup and the Phase III
+# envelope reuse the NumPy kernels.
+
+def load_jit():
+    import numba
+    import numpy as np
+
+    vec = load_numpy()
+
+    @numba.njit(cache=True)
+    def _gate(GM, FSC, delta, s0, g, a_min, r_safe, s_max, E, A, R, S, ST):
+        s = s0
+        for k in range(delta.shape[0]):
+            e = GM - FSC - delta[k]
+            margin = e / g
+            a = 0.0 if margin < 0.0 else (1.0 if margin > 1.0 else margin)
+            x = 1.0 - margin
+            r = x if x > 0.0 else 0.0
+            y = r - r_safe
+            s = s + (y if y > 0.0 else 0.0)
+            E[k] = e
+            if not np.isfinite(e):
+                A[k] = R[k] = S[k] = s = np.nan
+                ST[k] = ABSTAIN
+                continue
+            A[k] = a
+            R[k] = r
+            S[k] = s
+            if e <= 0.0 or a < a_min or s > s_max:
+                ST[k] = DENY
+            else:
+                ST[k] = ALLOW
+
+    def gate(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max):
+        delta = np.ascontiguousarray(delta, dtype=np.float64)
+        n = delta.shape[0]
+        E, A, R, S = (np.empty(n) for _ in range(4))
+        ST = np.empty(n, dtype=np.int8)
+        _gate(float(GM), float(FSC), delta, float(s0), max(GM_safe, EPS), float(a_min), float(r_safe), float(s_max),
+              E, A, R, S, ST)
+        return E, A, R, S, ST
+
+    @numba.njit(cache=True)
+    def _summary(GM, FSC, delta, s0, g, a_min, r_safe, s_max):
+        s = s0
+        n_allow = n_deny = n_abstain = 0
+        first = -1
+        first_e = first_s = np.nan
+        min_e = np.inf
+        max_s = -np.inf
+        for k in range(delta.shape[0]):
+            e = GM - FSC - delta[k]
+            margin = e / g
+            a = 0.0 if margin < 0.0 else (1.0 if margin > 1.0 else margin)
+            x = 1.0 - margin
+            r = x if x > 0.0 else 0.0
+            y = r - r_safe
+            s = s + (y if y > 0.0 else 0.0)
+            if not np.isfinite(e):
+                s = np.nan
+                n_abstain += 1
+            elif e <= 0.0 or a < a_min or s > s_max:
+                n_deny += 1
+                if first < 0:
+                    first = k
+                    first_e = e
+                    first_s = s
+            else:
+                n_allow += 1
+            if e < min_e:
+                min_e = e
+            if s > max_s:
+                max_s = s
+        return n_allow, n_deny, n_abstain, first, first_e, first_s, min_e, max_s, s
+
+    def summary(GM, FSC, delta, s0, GM_safe, a_min, r_safe, s_max):
+        delta = np.ascontiguousarray(delta, dtype=np.float64)
+        n_allow, n_deny, n_abstain, k, e, s, min_e, max_s, s_end = _summary(
+            float(GM), float(FSC), delta, float(s0), max(GM_safe, EPS), float(a_min), float(r_safe), float(s_max))
+        first = None if k < 0 else (int(k), float(e), float(s))
+        return int(n_allow), int(n_deny), int(n_abstain), first, float(min_e), float(max_s), float(s_end)
+
+    return types.SimpleNamespace(name="jit", base=vec.base, delta=vec.delta, gate=gate,
+                                 summary=summary, envelope=vec.envelope, tolist=vec.tolist)
+
+# --- registry ---
+
+BACKENDS = {"python": load_python, "numpy": load_numpy, "jit": load_jit}
+
+_loaded = {}
+
+def register_backend(name, loader, min_size=None, package=None):
+    # Add a backend; with min_size it also takes part in auto-selection.
+    BACKENDS[name] = loader
+    PACKAGES[name] = package
+    if min_size is not None:
+        AUTO_ORDER.append((name, min_size))
+        AUTO_ORDER.sort(key=lambda item: -item[1])
+
+def load_backend(name):
+    # Kernels of one backend (cached per process); SystemExit if its package is missing.
+    if name not in _loaded:
+        if name not in BACKENDS:
+            raise SystemExit(f"Unknown backend '{name}' (choose from: {', '.join(BACKENDS)}).")
+        try:
+            _loaded[name] = BACKENDS[name]()
+        except ImportError:
+            raise SystemExit(f"Backend '{name}' needs the '{PACKAGES[name]}' package: pip install {PACKAGES[name]}")
+    return _loaded[name]
+
+def available(name):
+    try:
+        load_backend(name)
+    except SystemExit:
+        return False
+    return True
+
+def select_backend(name, size):
+    # Backend name for --backend NAME / auto at this problem size.
+    if name != "auto":
+        load_backend(name)
+        return name
+    for cand, min_size in AUTO_ORDER:
+        if size >= min_size and available(cand):
+            return cand
+    return "python"
+
+def backend_choices():
+    return ["auto"] + list(BACKENDS)
+
+# --- cross-verification ---
+
+def first_index(codes, code):
+    for k, c in enumerate(codes):
+        if c == code:
+            return k
+    return None
+
+def verify_cases(T):
+    # Schedules and gate settings that exercise every branch: all four modes, DENY by
+    # GM_eff <= 0, by a < a_min and by s > s_max, ABSTAIN (NaN FSC, NaN GM), negative r_safe,
+    # and the Phase III thresholds (a swept finely across a_min + 0.05, s rising
+    # slowly through s_warn and s_max).
+    cases = []
+    for mode in ["square", "sine_abs", "ramp", "constant"]:
+        for GM, FSC, amp in [(0.53, 0.06, 0.06), (0.20, 0.02, 0.08), (0.16, 0.0, 0.25), (0.30, 0.05, 0.30)]:
+            cases.append(dict(GM=GM, FSC=FSC, mode=mode, amp=amp, period=20, duty=0.35,
+                              GM_safe=0.15, a_min=0.70, r_safe=0.10, s_max=1.00))
+    cases.append(dict(cases[5], FSC=float("nan")))
+    cases.append(dict(cases[5], GM=float("nan")))
+    cases.append(dict(cases[9], r_safe=-0.05, s_max=50.0))
+    cases.append(dict(cases[2], period=7, duty=0.5, a_min=0.0))
+    cases.append(dict(cases[8], GM=0.18, FSC=0.0, amp=0.08, period=997, r_safe=0.5))
+    cases.append(dict(cases[12], GM=0.14, FSC=0.0, amp=0.0, a_min=0.0, r_safe=0.0, s_max=300.0))
+    return [dict(c, T=T) for c in cases]
+
+def run_case(kern, c, block):
+    # Statuses, labels and s of one case, evaluated block by block as the scripts do.
+    status, labels, s_all = [], [], []
+    s = 0.0
+    for t0 in range(0, c["T"], block):
+        t1 = min(c["T"], t0 + block)
+        d = kern.delta(t0, t1, c["mode"], c["amp"], c["period"], c["duty"])
+        E, A, R, S, ST = kern.gate(c["GM"], c["FSC"], d, s, c["GM_safe"], c["a_min"], c["r_safe"], c["s_max"])
+        env = kern.envelope(ST, A, S, c["a_min"], c["s_max"], 0.80)
+        status += kern.tolist(ST)
+        labels += kern.tolist(env)
+        S = kern.tolist(S)
+        s_all += S
+        if S:
+            s = S[-1]
+    summ = kern.summary(c["GM"], c["FSC"], kern.delta(0, c["T"], c["mode"], c["amp"], c["period"], c["duty"]), 0.0,
+                        c["GM_safe"], c["a_min"], c["r_safe"], c["s_max"])
+    return status, labels, s_all, summ
+
+def same_float(x, y):
+    return x == y or (x != x and y != y)
+
+# Fleet rows (I_T, disp_vol, KB, KG, FSC): valid vessels, then rows whose GM or FSC
+# is non-finite, so every tick ABSTAINs.
+VERIFY_FLEET = [
+    (4000.0, 2000.0, 1.5, 3.3, 0.1),
+    (3000.0, 2000.0, 1.5, 2.8, 0.2),
+    (3.6, 8.0, 0.55, 0.9, 0.0),
+    (3.6, 0.0, 0.55, 0.9, 0.0),
+    (3.6, 8.0, 0.55, float("nan"), 0.0),
+    (3.6, 8.0, 0.55, 0.9, float("nan")),
+]
+
+def verify_fleet(name, T, block):
+    # Fleet rows from ssb_cyclic_fatigue.fleet_eval against the single-vessel reference
+    # summary over all T ticks (python kernels); NaN compares equal to NaN.
+    import array
+
+    from ssb_cyclic_fatigue import FLEET_OUT, fleet_eval
+
+    nan = float("nan")
+    sched = dict(mode="sine_abs", amp=0.3, period=37, duty=0.35, GM_safe=0.15, a_min=0.70, r_safe=0.10, s_max=1.00)
+    inp = array.array("d", [x for row in VERIFY_FLEET for x in row])
+    out = array.array("d", [0.0]) * (len(VERIFY_FLEET) * len(FLEET_OUT))
+    fleet_eval(inp, out, 0, len(VERIFY_FLEET), name, T, block, *sched.values())
+
+    deltas = py_delta(0, T, sched["mode"], sched["amp"], sched["period"], sched["duty"])
+    n_bad = 0
+    for v, (I_T, disp_vol, KB, KG, FSC) in enumerate(VERIFY_FLEET):
+        GM = py_base([I_T], [disp_vol], [KB], [KG])[2][0]
+        n_allow, n_deny, n_abstain, first, min_e, max_s, s_end = py_summary(
+            GM, FSC, deltas, 0.0, sched["GM_safe"], sched["a_min"], sched["r_safe"], sched["s_max"])
+        first = first or (nan, nan, nan)
+        want = [GM, n_allow, n_deny, n_abstain, first[0], first[1], first[2],
+                min_e if is_finite(min_e) else nan, max_s if is_finite(max_s) else nan, s_end]
+        got = list(out[v * len(FLEET_OUT):(v + 1) * len(FLEET_OUT)])
+        if not all(same_float(x, y) for x, y in zip(want, got)):
+            n_bad += 1
+            print(f"MISMATCH {name} fleet row {v}: {VERIFY_FLEET[v]}")
+            print(f"  single-vessel={want}")
+            print(f"  fleet        ={got}")
+    return n_bad
+
+def verify(names, T, block):
+    ref = load_backend("python")
+    ok = True
+    for name in names:
+        kern = load_backend(name)
+        n_bad = 0
+        max_ds = 0.0
+        for c in verify_cases(T):
+            st0, env0, s0, sum0 = run_case(ref, c, block)
+            st1, env1, s1, sum1 = run_case(kern, c, block)
+            hits0 = [first_index(st0, DENY), first_index(st0, ABSTAIN), first_index(env0, RESTRICTED)]
+            hits1 = [first_index(st1, DENY), first_index(st1, ABSTAIN), first_index(env1, RESTRICTED)]
+            same = st0 == st1 and env0 == env1 and hits0 == hits1 and sum0[:3] == sum1[:3]
+            same = same and (sum0[3] is None) == (sum1[3] is None) and (sum0[3] is None or sum0[3][0] == sum1[3][0])
+            same = same and all(same_float(x, y) for x, y in zip(sum0[4:], sum1[4:]))
+            if not same:
+                n_bad += 1
+                print(f"MISMATCH {name}: {c}")
+                print(f"  first DENY / ABSTAIN / RESTRICTED: python={hits0}  {name}={hits1}")
+            for x, y in zip(s0, s1):
+                if x == x and y == y:
+                    max_ds = max(max_ds, abs(x - y))
+        n_bad += verify_fleet(name, T, block)
+        n = len(verify_cases(T)) + 1
+        print(f"{name:<7} {'OK' if n_bad == 0 else 'FAIL'}  cases={n}  mismatched={n_bad}  max|ds|={max_ds:.3g}")
+        ok = ok and n_bad == 0
+    return ok
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SSB compute backends: list and cross-verify.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="Show backends, availability and auto-selection sizes.")
+    v = sub.add_parser("verify", help="Check every available backend against the python reference.")
+    v.add_argument("--backends", default="", help="Comma-separated backends (default: all available).")
+    v.add_argument("--T", type=int, default=5000, help="Ticks per verification case.")
+    v.add_argument("--block", type=int, default=1024, help="Ticks per kernel call (exercises carry of s).")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "list":
+        sizes = dict(AUTO_ORDER)
+        for name in BACKENDS:
+            state = "available" if available(name) else f"missing package '{PACKAGES[name]}'"
+            auto = f"auto from size {sizes[name]}" if name in sizes else "explicit only"
+            print(f"{name:<7} {state:<28} {auto}")
+        return 0
+
+    names = [x.strip() for x in args.backends.split(",") if x.strip()] or [n for n in BACKENDS if available(n)]
+    return 0 if verify(names, max(1, args.T), max(1, args.block)) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
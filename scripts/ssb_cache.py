@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+SSB content-addressed result cache.
+
+A run is identified by a canonical hash of:
+- script family (disp_sweep / multifsc / cyclic / phase3)
+- every input that affects outputs (numeric inputs, thresholds, labels)
+- code version (hash of the script sources that produce the outputs)
+
+Artifacts are copied into the cache and made read-only, so an entry cannot
+change under its key. On a hit they are hard-linked (or copied) into the new
+run folder instead of being recomputed; the shared files stay read-only.
+Text reports are rewritten so their "Outputs:" paths point at the new run
+folder, and input lines (e.g. "input_csv: <path>") name the new run's input:
+keys hold input file contents, not paths.
+
+Cache layout:
+  <cache_dir>/<key[:2]>/<key>/meta.json
+  <cache_dir>/<key[:2]>/<key>/<artifact files>
+
+Eviction is least-recently-used by meta.json mtime (touched on every hit).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+
+META_NAME = "meta.json"
+
+# Arguments that only decide where or how a run is written, never what it contains
+NON_KEY_ARGS = {"out_dir", "tag", "cache_dir", "cache_max_mb", "workers", "max_in_flight", "catalog"}
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def code_version(paths):
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(os.path.basename(p).encode("utf-8"))
+        h.update(file_digest(p).encode("ascii"))
+    return h.hexdigest()
+
+def cache_key(family, params, version):
+    items = {k: v for k, v in params.items() if k not in NON_KEY_ARGS}
+    blob = json.dumps({"family": family, "params": items, "code": version},
+                      sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def entry_dir(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key)
+
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+def link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def copy_read_only(src, dst):
+    shutil.copy2(src, dst)
+    os.chmod(dst, READ_ONLY)
+
+def remove_tree(path):
+    # Read-only files block deletion on Windows; clear the flag and retry once.
+    # Like ignore_errors, anything still failing (e.g. a concurrent evict) is skipped.
+    def retry(func, p, _exc):
+        try:
+            os.chmod(p, stat.S_IWRITE)
+            func(p)
+        except OSError:
+            pass
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=retry)
+    else:
+        shutil.rmtree(path, onerror=retry)
+
+def rewrite_report(text, src_run_dir, run_dir, old_inputs, inputs):
+    if src_run_dir:
+        text = text.replace(src_run_dir, run_dir)
+    lines = text.split("\n")
+    for label, old in old_inputs.items():
+        new = inputs.get(label)
+        if new is None:
+            continue
+        lines = [f"{label}: {new}" if line == f"{label}: {old}" else line for line in lines]
+    return "\n".join(lines)
+
+def cache_fetch(cache_dir, key, run_dir, inputs=None):
+    # Returns True and populates run_dir if the key is cached.
+    # inputs: {report label: input path} of this run, as given to cache_store.
+    edir = entry_dir(cache_dir, key)
+    meta_path = os.path.join(edir, META_NAME)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    src_run_dir = meta.get("run_dir", "")
+    old_inputs = meta.get("inputs", {})
+    for name in meta.get("files", []):
+        src = os.path.join(edir, name)
+        dst = os.path.join(run_dir, name)
+        if name.endswith(".txt"):
+            with open(src, "r", encoding="utf-8") as f:
+                text = f.read()
+            with open(dst, "w", encoding="utf-8") as f:
+                f.write(rewrite_report(text, src_run_dir, run_dir, old_inputs, inputs or {}))
+        else:
+            link_or_copy(src, dst)
+
+    # LRU bookkeeping
+    os.utime(meta_path, None)
+    return True
+
+def cache_store(cache_dir, key, run_dir, max_mb=0.0, inputs=None):
+    # inputs: {report label: input path} for inputs keyed by content (rewritten on fetch)
+    edir = entry_dir(cache_dir, key)
+    if os.path.isdir(edir):
+        return
+
+    tmp = f"{edir}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    files = []
+    for name in sorted(os.listdir(run_dir)):
+        src = os.path.join(run_dir, name)
+        if os.path.isfile(src):
+            copy_read_only(src, os.path.join(tmp, name))
+            files.append(name)
+
+    with open(os.path.join(tmp, META_NAME), "w", encoding="utf-8") as f:
+        json.dump({"key": key, "run_dir": run_dir, "files": files, "inputs": inputs or {}}, f, indent=2)
+
+    try:
+        os.rename(tmp, edir)
+    except OSError:
+        # Another run stored the same key first
+        remove_tree(tmp)
+
+    if max_mb and max_mb > 0.0:
+        evict(cache_dir, int(max_mb * 1024 * 1024))
+
+def list_entries(cache_dir):
+    # [(last_used, size_bytes, entry_dir)]
+    out = []
+    if not os.path.isdir(cache_dir):
+        return out
+    for prefix in os.listdir(cache_dir):
+        pdir = os.path.join(cache_dir, prefix)
+        if not os.path.isdir(pdir):
+            continue
+        for key in os.listdir(pdir):
+            edir = os.path.join(pdir, key)
+            meta_path = os.path.join(edir, META_NAME)
+            if not os.path.isfile(meta_path):
+                continue
+            size = 0
+            for name in os.listdir(edir):
+                size += os.path.getsize(os.path.join(edir, name))
+            out.append((os.path.getmtime(meta_path), size, edir))
+    return out
+
+def evict(cache_dir, max_bytes):
+    # Drop least-recently-used entries until the cache fits in max_bytes.
+    entries = sorted(list_entries(cache_dir))
+    total = sum(e[1] for e in entries)
+    removed = 0
+    for last_used, size, edir in entries:
+        if total <= max_bytes:
+            break
+        remove_tree(edir)
+        total -= size
+        removed += 1
+    return removed, total
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Inspect or trim an SSB result cache.")
+    ap.add_argument("--cache_dir", required=True, help="Cache directory.")
+    ap.add_argument("--max_mb", type=float, default=None, help="Evict LRU entries until the cache fits.")
+    args = ap.parse_args(argv)
+
+    if args.max_mb is not None:
+        removed, total = evict(args.cache_dir, int(args.max_mb * 1024 * 1024))
+        print(f"Evicted: {removed}")
+    entries = list_entries(args.cache_dir)
+    print(f"Entries: {len(entries)}")
+    print(f"Size (MB): {sum(e[1] for e in entries) / (1024 * 1024):.3f}")
+
+if __name__ == "__main__":
+    main()
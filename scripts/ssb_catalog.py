@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+SSB run catalog (SQLite).
+
+Every run folder becomes one row: parameters, status counts, first-hit indices
+and artifact paths. Key inputs are indexed so filters such as
+"KG>0.9 and first_deny<50" stay fast on very large catalogs.
+
+Commands:
+  register  (used by the scripts via --catalog; see register_run)
+  backfill  scan existing folders (e.g. reference_outputs/) and index them
+  query     filter runs, e.g.  query --db runs.sqlite --where "KG>0.9" --where "first_deny<50"
+
+first_deny / first_restricted are 0-based row indices (t for cyclic, j for
+the displacement sweep, i for the FSC ladder). first_deny_x is the swept value
+at that row (disp_vol, FSC_total or t).
+"""
+
+import argparse
+import csv
+import math
+import os
+import re
+import sqlite3
+import sys
+
+from ssb_io import csv_variants, find_csv, open_csv_read
+
+COLUMNS = [
+    ("run_dir", "TEXT NOT NULL UNIQUE"),
+    ("family", "TEXT"),
+    ("case_id", "TEXT"),
+    ("tag", "TEXT"),
+    ("run_ts", "TEXT"),
+    ("I_T", "REAL"),
+    ("disp_vol", "REAL"),
+    ("disp_start", "REAL"),
+    ("disp_end", "REAL"),
+    ("KB", "REAL"),
+    ("KG", "REAL"),
+    ("FSC", "REAL"),
+    ("GM_safe", "REAL"),
+    ("a_min", "REAL"),
+    ("r_safe", "REAL"),
+    ("s_max", "REAL"),
+    ("s_warn_frac", "REAL"),
+    ("mode", "TEXT"),
+    ("amp", "REAL"),
+    ("period", "INTEGER"),
+    ("duty", "REAL"),
+    ("T", "INTEGER"),
+    ("n_rows", "INTEGER"),
+    ("n_allow", "INTEGER"),
+    ("n_deny", "INTEGER"),
+    ("n_abstain", "INTEGER"),
+    ("n_restricted", "INTEGER"),
+    ("first_deny", "INTEGER"),
+    ("first_deny_x", "REAL"),
+    ("first_restricted", "INTEGER"),
+    ("final_s", "REAL"),
+    ("csv_path", "TEXT"),
+    ("report_path", "TEXT"),
+    ("phase3_csv_path", "TEXT"),
+]
+COLUMN_NAMES = [c for c, _ in COLUMNS]
+
+INDEXED = ["family", "case_id", "I_T", "disp_vol", "KB", "KG", "FSC", "mode", "amp", "first_deny", "run_ts"]
+
+# Parameters copied from a script's argparse namespace into its record
+ARG_FIELDS = ["case_id", "I_T", "disp_vol", "disp_start", "KB", "KG", "FSC",
+              "GM_safe", "a_min", "r_safe", "s_max",
+              "mode", "amp", "period", "duty", "T"]
+
+# (family, Phase II / Phase III csv, report); the csv may also be .csv.gz / .csv.zst
+ARTIFACTS = [
+    ("disp_sweep", "disp_sweep.csv", "disp_sweep_report.txt"),
+    ("multifsc", "multifsc_ladder.csv", "multifsc_ladder_report.txt"),
+    ("cyclic", "cyclic_fatigue.csv", "cyclic_fatigue_report.txt"),
+    ("cyclic_fleet", "fleet_summary.csv", "fleet_report.txt"),
+    ("phase3", "phase3_classification.csv", "phase3_summary.txt"),
+]
+
+RUN_DIR_RE = re.compile(r"^(\d{8}_\d{6})__(.+)__([^_].*)$")
+WHERE_RE = re.compile(r"^\s*([A-Za-z_]+)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$")
+KV_RE = re.compile(r"([A-Za-z_]+)(?:=|: )([^\s=]+)(?=\s|$)")
+
+def connect(db_path):
+    con = sqlite3.connect(db_path)
+    cols = ",\n  ".join(f"{c} {t}" for c, t in COLUMNS)
+    con.execute(f"CREATE TABLE IF NOT EXISTS runs (\n  id INTEGER PRIMARY KEY,\n  {cols}\n)")
+    for c in INDEXED:
+        con.execute(f"CREATE INDEX IF NOT EXISTS idx_runs_{c} ON runs({c})")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_runs_KG_first_deny ON runs(KG, first_deny)")
+    return con
+
+def run_record(run_dir, family, params, **fields):
+    rec = {"run_dir": os.path.abspath(run_dir), "family": family}
+    # Run folders are named <YYYYMMDD_HHMMSS>__<case_id>__<tag>
+    m = RUN_DIR_RE.match(os.path.basename(os.path.normpath(run_dir)))
+    if m:
+        rec["run_ts"] = m.group(1)
+        rec["tag"] = m.group(3)
+    for k in ARG_FIELDS:
+        if k in params:
+            rec[k] = params[k]
+    rec.update(fields)
+    return rec
+
+def upsert(con, records):
+    n = 0
+    for rec in records:
+        rec = {k: v for k, v in rec.items() if k in COLUMN_NAMES}
+        # NaN is not a meaningful SQL value; store as NULL
+        for k, v in rec.items():
+            if isinstance(v, float) and not math.isfinite(v):
+                rec[k] = None
+        names = list(rec.keys())
+        con.execute(
+            f"INSERT OR REPLACE INTO runs ({','.join(names)}) VALUES ({','.join('?' for _ in names)})",
+            [rec[k] for k in names])
+        n += 1
+    return n
+
+def register_run(db_path, rec):
+    con = connect(db_path)
+    with con:
+        upsert(con, [rec])
+    con.close()
+
+# --- Backfill: build records from existing run folders ---
+
+def parse_float(s):
+    try:
+        return float(s)
+    except Exception:
+        return float("nan")
+
+def read_report_params(path):
+    out = {}
+    if not path or not os.path.isfile(path):
+        return out
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("First") or line.startswith(" - "):
+                continue
+            for k, v in KV_RE.findall(line):
+                if k in ("GM_safe", "a_min", "r_safe", "s_max", "s_warn_frac", "amp", "duty"):
+                    out[k] = parse_float(v)
+                elif k in ("period", "T"):
+                    x = parse_float(v)
+                    out[k] = int(x) if math.isfinite(x) else None
+                elif k in ("mode", "case_id"):
+                    out[k] = v
+    return out
+
+def scan_phase2_csv(path, x_col):
+    rec = {}
+    counts = {"ALLOW": 0, "DENY": 0, "ABSTAIN": 0}
+    n = 0
+    with open_csv_read(path) as f:
+        for row in csv.DictReader(f):
+            if n == 0:
+                rec["case_id"] = row.get("case_id")
+                for k in ("I_T", "disp_vol", "KB", "KG", "FSC", "GM_safe"):
+                    if k in row:
+                        rec[k] = parse_float(row[k])
+                if x_col == "disp_vol":
+                    rec["disp_start"] = parse_float(row["disp_vol"])
+            status = (row.get("SSB_status") or "").strip().upper()
+            counts[status] = counts.get(status, 0) + 1
+            if status == "DENY" and "first_deny" not in rec:
+                rec["first_deny"] = n
+                rec["first_deny_x"] = parse_float(row.get(x_col))
+            last = row
+            n += 1
+    if n:
+        rec["final_s"] = parse_float(last.get("s"))
+        if x_col == "disp_vol":
+            rec["disp_end"] = parse_float(last["disp_vol"])
+            rec.pop("disp_vol", None)
+        if x_col == "FSC_total":
+            rec["FSC"] = parse_float(last.get("FSC_total"))
+    rec.update(n_rows=n, n_allow=counts.get("ALLOW", 0), n_deny=counts.get("DENY", 0),
+               n_abstain=n - counts.get("ALLOW", 0) - counts.get("DENY", 0))
+    return rec
+
+def scan_phase3_csv(path):
+    rec = {"n_restricted": 0}
+    counts = {}
+    n = 0
+    with open_csv_read(path) as f:
+        for row in csv.DictReader(f):
+            if n == 0:
+                rec["case_id"] = row.get("case_id")
+                for k in ("I_T", "disp_vol", "KB", "KG", "FSC", "GM_safe"):
+                    if k in row:
+                        rec[k] = parse_float(row[k])
+            env = (row.get("PHASE3_envelope") or "").strip()
+            counts[env] = counts.get(env, 0) + 1
+            if env == "ALLOW_RESTRICTED_MONITOR" and "first_restricted" not in rec:
+                rec["first_restricted"] = n
+            if env == "DENY_FINAL" and "first_deny" not in rec:
+                rec["first_deny"] = n
+            last = row
+            n += 1
+    if n:
+        rec["final_s"] = parse_float(last.get("s"))
+    rec.update(n_rows=n,
+               n_allow=counts.get("ALLOW_NORMAL", 0) + counts.get("ALLOW_RESTRICTED_MONITOR", 0),
+               n_restricted=counts.get("ALLOW_RESTRICTED_MONITOR", 0),
+               n_deny=counts.get("DENY_FINAL", 0),
+               n_abstain=counts.get("ABSTAIN_HUMAN_REVIEW", 0))
+    return rec
+
+def scan_fleet_csv(path):
+    # Fleet runs: one row per vessel; counts are vessels, first_deny is the earliest vessel DENY tick
+    n = n_denied = 0
+    first = None
+    with open_csv_read(path) as f:
+        for row in csv.DictReader(f):
+            t = (row.get("first_deny_t") or "").strip()
+            if t != "":
+                n_denied += 1
+                first = int(t) if first is None else min(first, int(t))
+            n += 1
+    rec = {"n_rows": n, "n_deny": n_denied, "n_allow": n - n_denied}
+    if first is not None:
+        rec["first_deny"] = first
+        rec["first_deny_x"] = float(first)
+    return rec
+
+def record_from_run_dir(run_dir):
+    names = set(os.listdir(run_dir))
+    found = [(a, find_csv(run_dir, a[1])) for a in ARTIFACTS]
+    found = [(a, p) for a, p in found if p is not None]
+    if not found:
+        return None
+    (family, csv_name, report_name), csv_path = found[0]
+    report_path = os.path.join(run_dir, report_name) if report_name in names else None
+
+    if family == "phase3":
+        fields = scan_phase3_csv(csv_path)
+        fields["phase3_csv_path"] = os.path.abspath(csv_path)
+    elif family == "cyclic_fleet":
+        fields = scan_fleet_csv(csv_path)
+    else:
+        x_col = {"disp_sweep": "disp_vol", "multifsc": "FSC_total", "cyclic": "t"}[family]
+        fields = scan_phase2_csv(csv_path, x_col)
+        p3 = find_csv(run_dir, "phase3_classification.csv")
+        if p3 is not None:
+            # Fused Phase III output in the same run folder
+            p3_fields = scan_phase3_csv(p3)
+            fields["n_restricted"] = p3_fields["n_restricted"]
+            fields["first_restricted"] = p3_fields.get("first_restricted")
+            fields["phase3_csv_path"] = os.path.abspath(p3)
+            fields.update(read_report_params(os.path.join(run_dir, "phase3_summary.txt")))
+    if family == "cyclic":
+        fields["T"] = fields["n_rows"]
+
+    params = read_report_params(report_path)
+    params.update(fields)
+    return run_record(run_dir, family, {}, csv_path=os.path.abspath(csv_path),
+                      report_path=os.path.abspath(report_path) if report_path else None, **params)
+
+def iter_run_dirs(roots):
+    known = {n for a in ARTIFACTS for n in csv_variants(a[1])}
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            if known.intersection(filenames):
+                yield dirpath
+
+def backfill(db_path, roots):
+    con = connect(db_path)
+    n = 0
+    with con:
+        for run_dir in iter_run_dirs(roots):
+            rec = record_from_run_dir(run_dir)
+            if rec is not None:
+                n += upsert(con, [rec])
+    con.close()
+    return n
+
+def parse_where(exprs):
+    clauses = []
+    values = []
+    for e in exprs:
+        m = WHERE_RE.match(e)
+        if m is None or m.group(1) not in COLUMN_NAMES:
+            raise SystemExit(f"Invalid --where '{e}'. Use <column><op><value> with one of: {', '.join(COLUMN_NAMES)}")
+        col, op, raw = m.groups()
+        v = raw.strip().strip("'\"")
+        try:
+            v = float(v)
+        except ValueError:
+            pass
+        clauses.append(f"{col} {op} ?")
+        values.append(v)
+    return clauses, values
+
+def query(db_path, where, family, columns, order_by, limit):
+    clauses, values = parse_where(where)
+    if family:
+        clauses.append("family = ?")
+        values.append(family)
+    for c in columns + ([order_by] if order_by else []):
+        if c not in COLUMN_NAMES:
+            raise SystemExit(f"Unknown column '{c}'.")
+    sql = f"SELECT {','.join(columns)} FROM runs"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    con = connect(db_path)
+    rows = con.execute(sql, values).fetchall()
+    con.close()
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SSB SQLite run catalog.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("backfill", help="Index existing run folders.")
+    b.add_argument("--db", required=True, help="Catalog SQLite file.")
+    b.add_argument("roots", nargs="+", help="Folders to scan (e.g. reference_outputs outputs).")
+
+    q = sub.add_parser("query", help="Filter runs.")
+    q.add_argument("--db", required=True, help="Catalog SQLite file.")
+    q.add_argument("--where", action="append", default=[], help="Filter like KG>0.9 or first_deny<50 (repeatable, AND).")
+    q.add_argument("--family", default="", help="disp_sweep | multifsc | cyclic | cyclic_fleet | phase3")
+    q.add_argument("--columns", default="run_dir,family,case_id,KG,FSC,n_deny,first_deny,first_deny_x",
+                   help="Comma-separated output columns.")
+    q.add_argument("--order_by", default="", help="Sort column.")
+    q.add_argument("--limit", type=int, default=0, help="Max rows (0 = all).")
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "backfill":
+        n = backfill(args.db, args.roots)
+        print(f"Indexed runs: {n}")
+        return
+
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()]
+    rows = query(args.db, args.where, args.family, columns, args.order_by, args.limit)
+    w = csv.writer(sys.stdout)
+    w.writerow(columns)
+    for r in rows:
+        w.writerow(r)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,44 @@
 #!/usr/bin/env python3
 import argparse
+import array
+import contextlib
 import csv
+import functools
 import math
+import operator
 import os
+import shutil
+import tempfile
 import datetime
 
+from ssb_io import COMPRESS_EXT, compressed_name, open_csv_read, open_csv_write
+from ssb_phase3_envelope import PHASE3_LABELS, merge_tally, new_tally, tally_envelope, write_summary
+
 EPS = 1e-12
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_FILES = [os.path.abspath(__file__), os.path.join(SCRIPT_DIR, "ssb_phase3_envelope.py"),
+              os.path.join(SCRIPT_DIR, "ssb_io.py"), os.path.join(SCRIPT_DIR, "ssb_shm.py"),
+              os.path.join(SCRIPT_DIR, "ssb_backend.py")]
+
+# Ticks per backend kernel call when writing per-tick rows
+BLOCK_TICKS = 65536
+
+CSV_HEADER = [
+    "t","case_id",
+    "I_T","disp_vol","KB","KG","FSC",
+    "BM","KM","GM",
+    "delta","GM_eff",
+    "classical_GM_sign",
+    "GM_safe",
+    "a","r","s","SSB_status"
+]
+
+# Fleet mode float64 tables, one row per vessel
+FLEET_IN = ["I_T", "disp_vol", "KB", "KG", "FSC"]
+FLEET_OUT = ["GM", "n_allow", "n_deny", "n_abstain", "first_deny_t", "first_deny_GM_eff", "first_deny_s",
+             "min_GM_eff", "max_s", "final_s"]
+
 def safe_run_dir(base_out_dir, case_id, tag):
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     case = str(case_id).strip().replace(" ", "_")
@@ -26,7 +58,7 @@ def clamp01(x):
     return x
 
 def write_csv(path, header, rows):
-    with open(path, "w", newline="", encoding="utf-8") as f:
+    with open_csv_write(path) as f:
         w = csv.writer(f)
         w.writerow(header)
         for r in rows:
@@ -80,37 +112,375 @@ def schedule_delta(t, mode, amp, period, duty):
     else:
         return amp  # constant
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--out_dir", default="ssb_cyclic_out", help="Base output directory.")
-    ap.add_argument("--case_id", default="CYCLIC_FATIGUE", help="Case label.")
-    ap.add_argument("--tag", default="", help="Optional run tag (e.g., FATIGUE_LATE_DENY).")
+def parse_float(s, default=float("nan")):
+    s = (s or "").strip()
+    if s == "":
+        return default
+    try:
+        return float(s)
+    except Exception:
+        return float("nan")
 
-    ap.add_argument("--I_T", type=float, default=3.60, help="Waterplane second moment I_T (m^4).")
-    ap.add_argument("--disp_vol", type=float, default=8.00, help="Displaced volume ∇ (m^3).")
-    ap.add_argument("--KB", type=float, default=0.55, help="KB (m).")
-    ap.add_argument("--KG", type=float, default=0.88, help="KG (m).")
-    ap.add_argument("--FSC", type=float, default=0.06, help="Base free surface correction FSC (m).")
+def read_fleet(path, default_FSC):
+    # One row per vessel: vessel_id, I_T, disp_vol, KB, KG, FSC (FSC optional).
+    # Returns the ids and a flat float64 table with one FLEET_IN row per vessel.
+    ids = []
+    params = array.array("d")
+    with open_csv_read(path) as f:
+        r = csv.DictReader(f)
+        for k, row in enumerate(r):
+            ids.append((row.get("vessel_id") or "").strip() or f"V{k}")
+            params.extend((
+                parse_float(row.get("I_T")),
+                parse_float(row.get("disp_vol")),
+                parse_float(row.get("KB")),
+                parse_float(row.get("KG")),
+                parse_float(row.get("FSC"), default_FSC),
+            ))
+    return ids, params
 
-    ap.add_argument("--T", type=int, default=200, help="Number of steps (deterministic ticks).")
+def fleet_eval(inp, out, v0, v1, backend, T, chunk, mode, amp, period, duty, GM_safe, a_min, r_safe, s_max):
+    # Vessels [v0, v1): reads their FLEET_IN rows from inp and writes their FLEET_OUT
+    # rows into out (flat float64 sequences: array('d') or a shared-memory view).
+    # Input columns are strided views of inp, so a worker reads the shared table in
+    # place. delta(t) is computed once per time chunk and broadcast across the
+    # vessels, so memory is bounded by chunk + vessel count instead of T x vessels.
+    from ssb_backend import load_backend
 
-    ap.add_argument("--mode", default="square", choices=["square","sine_abs","ramp","constant"],
-                    help="Deterministic disturbance schedule.")
-    ap.add_argument("--amp", type=float, default=0.06, help="Disturbance amplitude penalty (m).")
-    ap.add_argument("--period", type=int, default=20, help="Schedule period in ticks.")
-    ap.add_argument("--duty", type=float, default=0.35, help="Square wave duty cycle (0..1).")
+    kern = load_backend(backend)
+    n_in = len(FLEET_IN)
+    n_out = len(FLEET_OUT)
 
-    ap.add_argument("--GM_safe", type=float, default=0.15, help="Declared safe GM_eff threshold (m).")
-    ap.add_argument("--a_min", type=float, default=0.70, help="Minimum permission.")
-    ap.add_argument("--r_safe", type=float, default=0.10, help="Risk tolerance before resistance accumulates.")
-    ap.add_argument("--s_max", type=float, default=1.00, help="Maximum allowed resistance.")
+    # Column views must be released before a shared-memory block can close
+    with memoryview(inp) as rows, contextlib.ExitStack() as views:
+        cols = [views.enter_context(rows[v0 * n_in + j:v1 * n_in:n_in]) for j in range(n_in)]
+        fscs = cols[4]
+        GMs = kern.tolist(kern.base(*cols[:4])[2])
 
-    args = ap.parse_args()
+        # Per-vessel state: [GM, s, n_allow, n_deny, n_abstain, first_deny, min_GM_eff, max_s]
+        # min / max start at +-inf and are reported as NaN if no tick had a finite value.
+        states = [[GM, 0.0, 0, 0, 0, None, float("inf"), -float("inf")] for GM in GMs]
 
-    os.makedirs(args.out_dir, exist_ok=True)
-    run_dir = safe_run_dir(args.out_dir, args.case_id, args.tag)
+        for t0 in range(0, T, chunk):
+            t1 = min(T, t0 + chunk)
+            deltas = kern.delta(t0, t1, mode, amp, period, duty)
+            for FSC, st in zip(fscs, states):
+                GM, s = st[0], st[1]
+                if not is_finite(GM):
+                    # Every tick ABSTAINs and s is NaN, as in the single-vessel gate
+                    st[4] += t1 - t0
+                    st[1] = float("nan")
+                    continue
+                n_allow, n_deny, n_abstain, first, min_gme, max_s, s = kern.summary(
+                    GM, FSC, deltas, s, GM_safe, a_min, r_safe, s_max)
+                st[2] += n_allow
+                st[3] += n_deny
+                st[4] += n_abstain
+                if st[5] is None and first is not None:
+                    st[5] = (t0 + first[0], first[1], first[2])
+                if min_gme < st[6]:
+                    st[6] = min_gme
+                if max_s > st[7]:
+                    st[7] = max_s
+                st[1] = s
+
+    nan = float("nan")
+    for v, st in zip(range(v0, v1), states):
+        GM, s, n_allow, n_deny, n_abstain, first, min_gme, max_s = st
+        first = first if first is not None else (nan, nan, nan)
+        out[v * n_out:(v + 1) * n_out] = array.array("d", [
+            GM, n_allow, n_deny, n_abstain,
+            first[0], first[1], first[2],
+            min_gme if is_finite(min_gme) else nan,
+            max_s if is_finite(max_s) else nan,
+            s
+        ])
+
+def fleet_shard(job):
+    # Worker: attach to the shared tables and fill the output rows of vessels [v0, v1).
+    # Only the table descriptors and bounds are pickled; no rows travel back.
+    from ssb_shm import SharedTable
+
+    in_desc, out_desc, v0, v1 = job[:4]
+    with SharedTable.attach(in_desc) as inp, SharedTable.attach(out_desc) as out:
+        fleet_eval(inp.view, out.view, v0, v1, *job[4:])
+
+def run_fleet(args, run_dir):
+    # Vessel-by-time evaluation under one shared disturbance schedule.
+    # With --workers the vessels are split into slices evaluated in parallel on
+    # shared-memory input / output tables (one copy of the data for all workers).
+    ids, params = read_fleet(args.fleet_csv, args.FSC)
+    if not ids:
+        raise SystemExit("fleet_csv has no vessel rows.")
+    n = len(ids)
+
+    chunk = max(1, args.chunk)
+    sched = (args.T, chunk, args.mode, args.amp, max(1, args.period), max(0.0, min(1.0, args.duty)),
+             args.GM_safe, args.a_min, args.r_safe, args.s_max)
+
+    from ssb_backend import select_backend
+
+    backend = select_backend(args.backend, n * args.T)
+
+    workers = max(1, min(args.workers, n))
+    if workers == 1:
+        out = array.array("d", [0.0]) * (n * len(FLEET_OUT))
+        fleet_eval(params, out, 0, n, backend, *sched)
+        write_fleet(args, run_dir, ids, params, out, chunk, backend)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from ssb_shm import SharedTable
+
+    with SharedTable(n, len(FLEET_IN)) as tin, SharedTable(n, len(FLEET_OUT)) as tout:
+        tin.view[:] = params
+        del params
+
+        n_shards = min(n, 4 * workers)
+        bounds = [(k * n) // n_shards for k in range(n_shards + 1)]
+        jobs = [(tin.descriptor(), tout.descriptor(), bounds[k], bounds[k + 1], backend) + sched
+                for k in range(n_shards)]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(fleet_shard, jobs))
+
+        write_fleet(args, run_dir, ids, tin.view, tout.view, chunk, backend)
+
+def write_fleet(args, run_dir, ids, inp, out, chunk, backend):
+    out_csv = compressed_name(os.path.join(run_dir, "fleet_summary.csv"), args.compress)
+    out_txt = os.path.join(run_dir, "fleet_report.txt")
+    n_in = len(FLEET_IN)
+    n_out = len(FLEET_OUT)
+
+    n_denied = 0
+    first_min = first_max = None
+    for v in range(len(ids)):
+        fd_t = out[v * n_out + 4]
+        if fd_t == fd_t:
+            n_denied += 1
+            first_min = fd_t if first_min is None else min(first_min, fd_t)
+            first_max = fd_t if first_max is None else max(first_max, fd_t)
+
+    def rows():
+        for v, vid in enumerate(ids):
+            GM, n_allow, n_deny, n_abstain, fd_t, fd_gme, fd_s, min_gme, max_s, s = out[v * n_out:(v + 1) * n_out]
+            if fd_t != fd_t:
+                fd_t = fd_gme = fd_s = ""
+            else:
+                fd_t = int(fd_t)
+            yield ([vid] + list(inp[v * n_in:(v + 1) * n_in]) +
+                   [GM, int(n_allow), int(n_deny), int(n_abstain), fd_t, fd_gme, fd_s, min_gme, max_s, s])
+
+    header = [
+        "vessel_id",
+        "I_T","disp_vol","KB","KG","FSC",
+        "GM",
+        "n_allow","n_deny","n_abstain",
+        "first_deny_t","first_deny_GM_eff","first_deny_s",
+        "min_GM_eff",
+        "max_s","final_s"
+    ]
+    write_csv(out_csv, header, rows())
+
+    lines = []
+    lines.append("SSB CYCLIC FATIGUE — FLEET REPORT")
+    lines.append("")
+    lines.append(f"case_id: {args.case_id}")
+    lines.append(f"fleet_csv: {args.fleet_csv}")
+    lines.append(f"vessels: {len(ids)}  T={args.T}  chunk={chunk}")
+    lines.append(f"compute backend: {backend} (--backend {args.backend})")
+    lines.append("Base relations: BM=I_T/∇, KM=KB+BM, GM=KM-KG")
+    lines.append("")
+    lines.append("Lifecycle law:")
+    lines.append("GM_eff(t) = GM - FSC - delta(t)")
+    lines.append(f"delta schedule: mode={args.mode} amp={args.amp} period={args.period} duty={args.duty}")
+    lines.append("")
+    lines.append(f"SSB thresholds: GM_safe={args.GM_safe}  a_min={args.a_min}  r_safe={args.r_safe}  s_max={args.s_max}")
+    lines.append("")
+    lines.append(f"Vessels reaching DENY: {n_denied} of {len(ids)}")
+    if n_denied:
+        lines.append(f"First DENY tick: min={int(first_min)}  max={int(first_max)}")
+    else:
+        lines.append("First DENY tick: (not reached)")
+    lines.append("")
+    lines.append("Outputs:")
+    lines.append(f" - {out_csv}")
+    lines.append(f" - {out_txt}")
+
+    with open(out_txt, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+def shard_increments(job):
+    # Pass 1: per-tick resistance increments max(0, r - r_safe) for ticks [t0, t1)
+    # (NaN on ABSTAIN). delta(t) and r come from the same backend kernels as pass 2,
+    # so s_old + inc reproduces the serial update bit for bit. Zero increments are
+    # not stored: s + 0.0 == s for every s the gate produces (s >= 0 or NaN).
+    from ssb_backend import STATUS_NAMES, load_backend
+
+    (t0, t1, inc_path, backend), sched = job[:4], job[4:]
+    GM, FSC, mode, amp, period, duty, GM_safe, a_min, r_safe, s_max = sched
+    kern = load_backend(backend)
+    with open(inc_path, "wb") as f:
+        for b0 in range(t0, t1, BLOCK_TICKS):
+            b1 = min(t1, b0 + BLOCK_TICKS)
+            deltas = kern.delta(b0, b1, mode, amp, period, duty)
+            cols = kern.gate(GM, FSC, deltas, 0.0, GM_safe, a_min, r_safe, s_max)
+            incs = array.array("d")
+            for r, code in zip(kern.tolist(cols[2]), kern.tolist(cols[4])):
+                inc = math.nan if STATUS_NAMES[code] == "ABSTAIN" else max(0.0, r - r_safe)
+                if inc != 0.0:
+                    incs.append(inc)
+            incs.tofile(f)
+
+def fold_increments(inc_path, s):
+    # Exclusive-scan step: continue the serial fold s = s + inc over one shard.
+    with open(inc_path, "rb") as f:
+        while True:
+            block = array.array("d")
+            try:
+                block.fromfile(f, 65536)
+            except EOFError:
+                pass
+            if not block:
+                return s
+            s = functools.reduce(operator.add, block, s)
 
-    out_csv = os.path.join(run_dir, "cyclic_fatigue.csv")
+def emit_rows(w, t0, t1, s0, row_const, sched, w3=None, s_warn_frac=None, backend="python"):
+    # Evaluate ticks [t0, t1) starting from resistance s0 and write one CSV row per tick.
+    # With w3 set, the Phase III envelope is applied inline and written alongside.
+    # The backend evaluates BLOCK_TICKS ticks per call; s carries across blocks.
+    from ssb_backend import STATUS_NAMES, load_backend
+
+    case_id, I_T, disp_vol, KB, KG, BM, KM = row_const
+    GM, FSC, mode, amp, period, duty, GM_safe, a_min, r_safe, s_max = sched
+    kern = load_backend(backend)
+    s = s0
+    first_deny_t = None
+    counts = {"ALLOW": 0, "DENY": 0, "ABSTAIN": 0}
+    tally = new_tally() if w3 is not None else None
+    for b0 in range(t0, t1, BLOCK_TICKS):
+        b1 = min(t1, b0 + BLOCK_TICKS)
+        deltas = kern.delta(b0, b1, mode, amp, period, duty)
+        cols = kern.gate(GM, FSC, deltas, s, GM_safe, a_min, r_safe, s_max)
+        envs = kern.tolist(kern.envelope(cols[4], cols[1], cols[3], a_min, s_max, s_warn_frac)) if w3 is not None else None
+        deltas = kern.tolist(deltas)
+        GM_effs, As, Rs, Ss, codes = (kern.tolist(c) for c in cols)
+
+        for k, t in enumerate(range(b0, b1)):
+            delta, GM_eff, a, r, s = deltas[k], GM_effs[k], As[k], Rs[k], Ss[k]
+            status = STATUS_NAMES[codes[k]]
+            classical = "STABLE" if (is_finite(GM_eff) and GM_eff > 0.0) else "UNSTABLE"
+
+            counts[status] += 1
+            if first_deny_t is None and status == "DENY":
+                first_deny_t = (t, GM_eff, a, r, s, delta)
+
+            row = [
+                t, case_id,
+                I_T, disp_vol, KB, KG, FSC,
+                BM, KM, GM,
+                delta, GM_eff,
+                classical,
+                GM_safe,
+                a, r, s, status
+            ]
+            w.writerow(row)
+
+            if w3 is not None:
+                env = PHASE3_LABELS[envs[k]]
+                row.append(env)
+                w3.writerow(row)
+                tally_envelope(tally, env)
+    return {"first_deny": first_deny_t, "counts": counts, "s": s, "tally": tally}
+
+def run_serial(args, out_csv, row_const, sched, backend, out_csv3=None):
+    with open_csv_write(out_csv) as f:
+        w = csv.writer(f)
+        w.writerow(CSV_HEADER)
+        if out_csv3 is None:
+            return emit_rows(w, 0, args.T, 0.0, row_const, sched, backend=backend)
+        with open_csv_write(out_csv3) as g:
+            w3 = csv.writer(g)
+            w3.writerow(CSV_HEADER + ["PHASE3_envelope"])
+            return emit_rows(w, 0, args.T, 0.0, row_const, sched, w3, args.s_warn_frac, backend)
+
+def shard_rows(job):
+    # Pass 2: write the CSV rows of ticks [t0, t1) starting from the scanned offset s0.
+    (t0, t1, s0, part_path, part_path3, s_warn_frac, row_const, backend), sched = job[:8], job[8:]
+    with open(part_path, "w", newline="", encoding="utf-8") as f:
+        if part_path3 is None:
+            return emit_rows(csv.writer(f), t0, t1, s0, row_const, sched, backend=backend)
+        with open(part_path3, "w", newline="", encoding="utf-8") as g:
+            return emit_rows(csv.writer(f), t0, t1, s0, row_const, sched, csv.writer(g), s_warn_frac, backend)
+
+def concat_parts(out_path, header, part_paths):
+    # Shard parts are plain text; only the final artifact is compressed
+    with open_csv_write(out_path) as f:
+        csv.writer(f).writerow(header)
+        for path in part_paths:
+            with open(path, "r", newline="", encoding="utf-8") as part:
+                shutil.copyfileobj(part, f)
+
+def run_sharded(args, run_dir, out_csv, row_const, sched, backend, out_csv3=None):
+    # Two-pass parallel prefix sum over time shards:
+    #   pass 1 (parallel): per-shard increments of s
+    #   scan   (serial):   exclusive offsets s0[k] by folding the increments in order
+    #   pass 2 (parallel): per-shard rows from s0[k], concatenated in shard order
+    # The scan folds the stored increments instead of adding shard totals so every
+    # offset is bit-identical to the serial accumulation; statuses, s values and
+    # first-DENY detection across shard boundaries therefore match the serial loop.
+    # Increments go to a temporary directory (at most 8 bytes per tick with s growing).
+    workers = max(1, args.workers)
+    n_shards = min(workers, max(1, args.T))
+    bounds = [(k * args.T) // n_shards for k in range(n_shards + 1)]
+
+    inc_dir = tempfile.mkdtemp(prefix="ssb_shard_inc_")
+    inc_paths = [os.path.join(inc_dir, f"shard_{k:04d}.inc") for k in range(n_shards)]
+    part_paths = [os.path.join(run_dir, f".shard_{k:04d}.csv") for k in range(n_shards)]
+    if out_csv3 is None:
+        part_paths3 = [None] * n_shards
+    else:
+        part_paths3 = [os.path.join(run_dir, f".shard_{k:04d}.phase3.csv") for k in range(n_shards)]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            jobs = [(bounds[k], bounds[k + 1], inc_paths[k], backend) + sched for k in range(n_shards)]
+            list(ex.map(shard_increments, jobs))
+
+            offsets = []
+            s = 0.0
+            for path in inc_paths:
+                offsets.append(s)
+                s = fold_increments(path, s)
+
+            jobs = [(bounds[k], bounds[k + 1], offsets[k], part_paths[k], part_paths3[k], args.s_warn_frac, row_const,
+                     backend) + sched for k in range(n_shards)]
+            results = list(ex.map(shard_rows, jobs))
+
+        concat_parts(out_csv, CSV_HEADER, part_paths)
+        if out_csv3 is not None:
+            concat_parts(out_csv3, CSV_HEADER + ["PHASE3_envelope"], part_paths3)
+    finally:
+        shutil.rmtree(inc_dir, ignore_errors=True)
+        for path in part_paths + part_paths3:
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+    stats = results[0]
+    for part in results[1:]:
+        if stats["first_deny"] is None:
+            stats["first_deny"] = part["first_deny"]
+        for k, v in part["counts"].items():
+            stats["counts"][k] += v
+        stats["s"] = part["s"]
+        if stats["tally"] is not None:
+            merge_tally(stats["tally"], part["tally"])
+    return stats
+
+def run_single(args, run_dir):
+    out_csv = compressed_name(os.path.join(run_dir, "cyclic_fatigue.csv"), args.compress)
     out_txt = os.path.join(run_dir, "cyclic_fatigue_report.txt")
 
     base = compute_base(args.I_T, args.disp_vol, args.KB, args.KG)
@@ -118,40 +488,22 @@ def main():
         raise SystemExit("Invalid base inputs (I_T, disp_vol, KB, KG).")
     BM, KM, GM = base
 
-    s = 0.0
-    first_deny_t = None
+    row_const = (args.case_id, args.I_T, args.disp_vol, args.KB, args.KG, BM, KM)
+    sched = (GM, args.FSC, args.mode, args.amp, max(1, args.period), max(0.0, min(1.0, args.duty)),
+             args.GM_safe, args.a_min, args.r_safe, args.s_max)
 
-    rows = []
-    for t in range(args.T):
-        delta = schedule_delta(t, args.mode, args.amp, max(1, args.period), max(0.0, min(1.0, args.duty)))
-        GM_eff = GM - args.FSC - delta
-        classical = "STABLE" if (is_finite(GM_eff) and GM_eff > 0.0) else "UNSTABLE"
-
-        a, r, s, status = ssb_gate(GM_eff, args.GM_safe, args.a_min, s, args.r_safe, args.s_max)
-
-        if first_deny_t is None and status == "DENY":
-            first_deny_t = (t, GM_eff, a, r, s, delta)
-
-        rows.append([
-            t, args.case_id,
-            args.I_T, args.disp_vol, args.KB, args.KG, args.FSC,
-            BM, KM, GM,
-            delta, GM_eff,
-            classical,
-            args.GM_safe,
-            a, r, s, status
-        ])
+    out_csv3 = compressed_name(os.path.join(run_dir, "phase3_classification.csv"), args.compress) if args.phase3 else None
+    out_txt3 = os.path.join(run_dir, "phase3_summary.txt") if args.phase3 else None
 
-    header = [
-        "t","case_id",
-        "I_T","disp_vol","KB","KG","FSC",
-        "BM","KM","GM",
-        "delta","GM_eff",
-        "classical_GM_sign",
-        "GM_safe",
-        "a","r","s","SSB_status"
-    ]
-    write_csv(out_csv, header, rows)
+    from ssb_backend import select_backend
+
+    backend = select_backend(args.backend, args.T)
+    if args.workers > 1:
+        stats = run_sharded(args, run_dir, out_csv, row_const, sched, backend, out_csv3)
+    else:
+        stats = run_serial(args, out_csv, row_const, sched, backend, out_csv3)
+    first_deny_t = stats["first_deny"]
+    tally = stats["tally"]
 
     lines = []
     lines.append("SSB CYCLIC FATIGUE — DETERMINISTIC REPORT")
@@ -166,6 +518,7 @@ def main():
     lines.append(f"delta schedule: mode={args.mode} amp={args.amp} period={args.period} duty={args.duty}")
     lines.append("")
     lines.append(f"SSB thresholds: GM_safe={args.GM_safe}  a_min={args.a_min}  r_safe={args.r_safe}  s_max={args.s_max}")
+    lines.append(f"compute backend: {backend} (--backend {args.backend})")
     lines.append("")
     if first_deny_t is None:
         lines.append("First DENY: (not reached)")
@@ -176,9 +529,123 @@ def main():
     lines.append("Outputs:")
     lines.append(f" - {out_csv}")
     lines.append(f" - {out_txt}")
+    if args.phase3:
+        lines.append(f" - {out_csv3}")
+        lines.append(f" - {out_txt3}")
 
     with open(out_txt, "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
 
+    if args.phase3:
+        write_summary(out_txt3, out_csv, args.a_min, args.s_max, args.s_warn_frac, tally, out_csv3)
+
+    if args.catalog:
+        from ssb_catalog import register_run, run_record
+
+        counts = stats["counts"]
+        fields = dict(
+            n_rows=args.T, n_allow=counts["ALLOW"], n_deny=counts["DENY"], n_abstain=counts["ABSTAIN"],
+            first_deny=None if first_deny_t is None else first_deny_t[0],
+            first_deny_x=None if first_deny_t is None else float(first_deny_t[0]),
+            final_s=stats["s"] if args.T > 0 else None,
+            csv_path=os.path.abspath(out_csv), report_path=os.path.abspath(out_txt),
+        )
+        if args.phase3:
+            fields.update(s_warn_frac=args.s_warn_frac,
+                          n_restricted=tally["counts"]["ALLOW_RESTRICTED_MONITOR"],
+                          first_restricted=tally["first_restricted"],
+                          phase3_csv_path=os.path.abspath(out_csv3))
+        register_run(args.catalog, run_record(run_dir, "cyclic", vars(args), **fields))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out_dir", default="ssb_cyclic_out", help="Base output directory.")
+    ap.add_argument("--case_id", default="CYCLIC_FATIGUE", help="Case label.")
+    ap.add_argument("--tag", default="", help="Optional run tag (e.g., FATIGUE_LATE_DENY).")
+
+    ap.add_argument("--I_T", type=float, default=3.60, help="Waterplane second moment I_T (m^4).")
+    ap.add_argument("--disp_vol", type=float, default=8.00, help="Displaced volume ∇ (m^3).")
+    ap.add_argument("--KB", type=float, default=0.55, help="KB (m).")
+    ap.add_argument("--KG", type=float, default=0.88, help="KG (m).")
+    ap.add_argument("--FSC", type=float, default=0.06, help="Base free surface correction FSC (m).")
+
+    ap.add_argument("--T", type=int, default=200, help="Number of steps (deterministic ticks).")
+
+    ap.add_argument("--mode", default="square", choices=["square","sine_abs","ramp","constant"],
+                    help="Deterministic disturbance schedule.")
+    ap.add_argument("--amp", type=float, default=0.06, help="Disturbance amplitude penalty (m).")
+    ap.add_argument("--period", type=int, default=20, help="Schedule period in ticks.")
+    ap.add_argument("--duty", type=float, default=0.35, help="Square wave duty cycle (0..1).")
+
+    ap.add_argument("--GM_safe", type=float, default=0.15, help="Declared safe GM_eff threshold (m).")
+    ap.add_argument("--a_min", type=float, default=0.70, help="Minimum permission.")
+    ap.add_argument("--r_safe", type=float, default=0.10, help="Risk tolerance before resistance accumulates.")
+    ap.add_argument("--s_max", type=float, default=1.00, help="Maximum allowed resistance.")
+
+    ap.add_argument("--fleet_csv", default="",
+                    help="Optional vessel table (vessel_id,I_T,disp_vol,KB,KG,FSC). Evaluates every vessel "
+                         "under the same schedule and writes fleet_summary.csv instead of a per-tick CSV.")
+    ap.add_argument("--chunk", type=int, default=4096, help="Fleet mode: ticks evaluated per time chunk.")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Split the T ticks into time shards evaluated on this many processes "
+                         "(two-pass prefix sum over s; output identical to the serial loop). Pass 1 keeps "
+                         "the non-zero s increments in a temporary directory (TMPDIR): up to 8 bytes per tick. "
+                         "Fleet mode: split the vessels into slices over shared-memory tables.")
+    ap.add_argument("--backend", default="auto",
+                    help="Compute backend for the gate kernels: auto, python, numpy, jit (auto = chosen "
+                         "from problem size; see ssb_backend.py list).")
+    ap.add_argument("--phase3", action="store_true",
+                    help="Also apply the Phase III envelope inline and write phase3_classification.csv "
+                         "and phase3_summary.txt into the same run folder.")
+    ap.add_argument("--s_warn_frac", type=float, default=0.80,
+                    help="Phase III: restricted envelope starts at this fraction of s_max.")
+    ap.add_argument("--cache_dir", default="",
+                    help="Optional result cache. Identical inputs + code reuse the cached artifacts.")
+    ap.add_argument("--cache_max_mb", type=float, default=0.0,
+                    help="Cache size limit in MB (LRU eviction; 0 = unlimited).")
+    ap.add_argument("--compress", default="none", choices=list(COMPRESS_EXT),
+                    help="Write the run CSVs as .csv.gz / .csv.zst, compressed on a background thread.")
+    ap.add_argument("--catalog", default="", help="Optional SQLite run catalog to register this run in.")
+
+    args = ap.parse_args(argv)
+
+    # Checked after parsing so --help does not load the backend registry
+    from ssb_backend import backend_choices
+
+    if args.backend not in backend_choices():
+        ap.error(f"argument --backend: invalid choice: '{args.backend}' (choose from {', '.join(backend_choices())})")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    run_dir = safe_run_dir(args.out_dir, args.case_id, args.tag)
+
+    if args.cache_dir:
+        from ssb_cache import cache_fetch, cache_key, code_version, file_digest
+
+        params = dict(vars(args))
+        if args.fleet_csv:
+            params["fleet_csv"] = file_digest(args.fleet_csv)
+        cache_inputs = {"fleet_csv": args.fleet_csv} if args.fleet_csv else None
+        cache_id = cache_key("cyclic", params, code_version(CODE_FILES))
+        if cache_fetch(args.cache_dir, cache_id, run_dir, cache_inputs):
+            if args.catalog:
+                from ssb_catalog import record_from_run_dir, register_run
+
+                register_run(args.catalog, record_from_run_dir(run_dir))
+            return
+
+    if args.fleet_csv:
+        run_fleet(args, run_dir)
+        if args.catalog:
+            from ssb_catalog import record_from_run_dir, register_run
+
+            register_run(args.catalog, record_from_run_dir(run_dir))
+    else:
+        run_single(args, run_dir)
+
+    if args.cache_dir:
+        from ssb_cache import cache_store
+
+        cache_store(args.cache_dir, cache_id, run_dir, args.cache_max_mb, cache_inputs)
+
 if __name__ == "__main__":
     main()
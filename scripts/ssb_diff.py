@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+SSB run diff: where do two runs of the same case first diverge?
+
+  python scripts/ssb_diff.py <run_a> <run_b> [--atol 1e-12] [--rtol 0]
+
+Each side is a run folder or a CSV file (.csv, .csv.gz, .csv.zst). Rows are
+aligned by step index (row k of A against row k of B) and columns by name.
+For a folder, the first artifact present in both runs is used, in this order:
+phase3_classification.csv (carries status, s and envelope), then the Phase II
+CSVs, fleet_summary.csv and limit_curves.csv; --file picks one explicitly.
+
+Both files are streamed in chunks of --chunk_rows lines, so memory does not
+grow with file size. Identical chunks are skipped with a single list compare
+and identical lines with a string compare; only lines whose text differs are
+parsed. Numeric cells are equal when |a - b| <= atol + rtol * |b| (NaN equals
+NaN); any other cell must match exactly.
+
+--binary TYPECODE compares two raw files of array-module items (e.g. "d" for
+float64) chunk-wise with the same tolerances; --record_len maps item index to
+step index.
+
+Exit status: 0 if the runs agree within tolerance, 1 if they diverge.
+"""
+
+import argparse
+import array
+import csv
+import itertools
+import math
+import os
+import sys
+
+from ssb_io import find_csv, open_csv_read
+
+CHUNK_ROWS = 65536
+BINARY_CHUNK_ITEMS = 1 << 18
+
+# Artifacts tried for run folders, most informative first
+RUN_CSVS = ["phase3_classification.csv", "disp_sweep.csv", "multifsc_ladder.csv", "cyclic_fatigue.csv",
+            "fleet_summary.csv", "limit_curves.csv"]
+
+# Columns reported on their own: where the governance outcome first changes
+KEY_COLUMNS = ["SSB_status", "s", "PHASE3_envelope"]
+
+def resolve_input(path, other, name):
+    # Returns the CSV to compare for `path`; `other` is the opposite side.
+    if not os.path.isdir(path):
+        return path
+    names = [name] if name else RUN_CSVS
+    for n in names:
+        p = find_csv(path, n)
+        if p is not None and (not os.path.isdir(other) or find_csv(other, n) is not None):
+            return p
+    raise SystemExit(f"No common run CSV in {path} and {other} (tried: {', '.join(names)}).")
+
+def parse_float(s):
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+def new_col_stats():
+    return {"n_diff": 0, "first": None, "max_delta": 0.0, "max_row": None}
+
+def cell_delta(a, b, atol, rtol):
+    # None if equal within tolerance, otherwise |a - b| (inf for non-numeric mismatches).
+    if a == b:
+        return None
+    x = parse_float(a)
+    y = parse_float(b)
+    if x is None or y is None:
+        return math.inf
+    if math.isnan(x) or math.isnan(y):
+        return None if (math.isnan(x) and math.isnan(y)) else math.inf
+    d = abs(x - y)
+    if d <= atol + rtol * abs(y):
+        return None
+    return d
+
+def compare_rows(k, ra, rb, pairs, stats, atol, rtol):
+    diverged = False
+    for name, ia, ib in pairs:
+        a = ra[ia] if ia < len(ra) else ""
+        b = rb[ib] if ib < len(rb) else ""
+        d = cell_delta(a, b, atol, rtol)
+        if d is None:
+            continue
+        diverged = True
+        st = stats[name]
+        st["n_diff"] += 1
+        if st["first"] is None:
+            st["first"] = (k, a, b)
+        if d > st["max_delta"] or st["max_row"] is None:
+            st["max_delta"] = d
+            st["max_row"] = k
+    return diverged
+
+def diff_csv(path_a, path_b, atol, rtol, chunk_rows):
+    with open_csv_read(path_a) as fa, open_csv_read(path_b) as fb:
+        head_a = next(csv.reader([fa.readline()]), [])
+        head_b = next(csv.reader([fb.readline()]), [])
+        idx_b = {c: i for i, c in enumerate(head_b)}
+        pairs = [(c, i, idx_b[c]) for i, c in enumerate(head_a) if c in idx_b]
+        stats = {c: new_col_stats() for c, _, _ in pairs}
+        # With identical headers, identical line text means identical cells
+        same_layout = head_a == head_b
+
+        result = {
+            "columns_only_a": [c for c in head_a if c not in idx_b],
+            "columns_only_b": [c for c in head_b if c not in set(head_a)],
+            "stats": stats, "n_rows_a": 0, "n_rows_b": 0,
+            "first_row": None, "n_diff_rows": 0,
+        }
+
+        k = 0
+        while True:
+            ca = list(itertools.islice(fa, chunk_rows))
+            cb = list(itertools.islice(fb, chunk_rows))
+            n = min(len(ca), len(cb))
+            result["n_rows_a"] += len(ca)
+            result["n_rows_b"] += len(cb)
+            if not (same_layout and ca == cb):
+                for off in range(n):
+                    if same_layout and ca[off] == cb[off]:
+                        continue
+                    ra = next(csv.reader([ca[off]]))
+                    rb = next(csv.reader([cb[off]]))
+                    if compare_rows(k + off, ra, rb, pairs, stats, atol, rtol):
+                        result["n_diff_rows"] += 1
+                        if result["first_row"] is None:
+                            result["first_row"] = k + off
+            k += n
+            if len(ca) != len(cb) or not ca:
+                break
+
+        # One side ended early: count what is left on the longer side
+        if len(ca) > len(cb):
+            result["n_rows_a"] += sum(1 for _ in fa)
+        elif len(cb) > len(ca):
+            result["n_rows_b"] += sum(1 for _ in fb)
+    return result
+
+def diff_binary(path_a, path_b, typecode, record_len, atol, rtol):
+    item = array.array(typecode).itemsize
+    chunk_bytes = BINARY_CHUNK_ITEMS * item
+    st = new_col_stats()
+    n_a = os.path.getsize(path_a) // item
+    n_b = os.path.getsize(path_b) // item
+    with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+        k = 0
+        while True:
+            ba = fa.read(chunk_bytes)
+            bb = fb.read(chunk_bytes)
+            n = min(len(ba), len(bb)) // item
+            if n == 0:
+                break
+            if ba[:n * item] != bb[:n * item]:
+                xa = array.array(typecode, ba[:n * item])
+                xb = array.array(typecode, bb[:n * item])
+                for off, (x, y) in enumerate(zip(xa, xb)):
+                    if x == y or (x != x and y != y):
+                        continue
+                    d = math.inf if (x != x or y != y) else abs(x - y)
+                    if d <= atol + rtol * abs(y):
+                        continue
+                    st["n_diff"] += 1
+                    if st["first"] is None:
+                        st["first"] = ((k + off) // record_len, x, y)
+                    if d > st["max_delta"] or st["max_row"] is None:
+                        st["max_delta"] = d
+                        st["max_row"] = (k + off) // record_len
+            k += n
+            if len(ba) != len(bb):
+                break
+    return {"items_a": n_a, "items_b": n_b, "stats": st}
+
+def report_csv(path_a, path_b, res, atol, rtol):
+    stats = res["stats"]
+    lines = []
+    lines.append("SSB RUN DIFF")
+    lines.append("")
+    lines.append(f"A: {path_a}")
+    lines.append(f"B: {path_b}")
+    lines.append(f"tolerance: |a-b| <= {atol} + {rtol}*|b|")
+    lines.append(f"rows: A={res['n_rows_a']}  B={res['n_rows_b']}")
+    if res["columns_only_a"]:
+        lines.append(f"columns only in A: {', '.join(res['columns_only_a'])}")
+    if res["columns_only_b"]:
+        lines.append(f"columns only in B: {', '.join(res['columns_only_b'])}")
+    lines.append("")
+
+    first = res["first_row"]
+    if first is None:
+        lines.append("First divergence: (none in common rows)")
+    else:
+        cols = [c for c, st in stats.items() if st["first"] is not None and st["first"][0] == first]
+        lines.append(f"First divergence: row_index={first}  columns: {', '.join(cols)}")
+        for c in cols:
+            _, a, b = stats[c]["first"]
+            lines.append(f"   {c}: A={a}  B={b}")
+    if res["n_rows_a"] != res["n_rows_b"]:
+        lines.append(f"Length differs from row_index={min(res['n_rows_a'], res['n_rows_b'])}")
+    lines.append(f"Rows differing: {res['n_diff_rows']}")
+    lines.append("")
+
+    for c in KEY_COLUMNS:
+        if c in stats:
+            st = stats[c]
+            if st["first"] is None:
+                lines.append(f"First {c} divergence: (none)")
+            else:
+                k, a, b = st["first"]
+                lines.append(f"First {c} divergence: row_index={k}  A={a}  B={b}")
+    lines.append("")
+
+    lines.append("Per-column (differing columns only):")
+    width = max([len(c) for c in stats] + [6])
+    any_col = False
+    for c, st in stats.items():
+        if st["n_diff"] == 0:
+            continue
+        any_col = True
+        delta = "non-numeric" if math.isinf(st["max_delta"]) else f"{st['max_delta']:.6g}"
+        lines.append(f" - {c:<{width}}  n_diff={st['n_diff']}  first_row={st['first'][0]}"
+                     f"  max_delta={delta} at row_index={st['max_row']}")
+    if not any_col:
+        lines.append(" (none)")
+    return lines
+
+def report_binary(path_a, path_b, res, typecode, record_len, atol, rtol):
+    st = res["stats"]
+    lines = []
+    lines.append("SSB RUN DIFF (binary)")
+    lines.append("")
+    lines.append(f"A: {path_a}")
+    lines.append(f"B: {path_b}")
+    lines.append(f"typecode: {typecode}  record_len: {record_len}")
+    lines.append(f"tolerance: |a-b| <= {atol} + {rtol}*|b|")
+    lines.append(f"items: A={res['items_a']}  B={res['items_b']}")
+    if st["first"] is None:
+        lines.append("First divergence: (none in common items)")
+    else:
+        k, a, b = st["first"]
+        lines.append(f"First divergence: step_index={k}  A={a}  B={b}")
+        lines.append(f"Items differing: {st['n_diff']}  max_delta={st['max_delta']:.6g} at step_index={st['max_row']}")
+    if res["items_a"] != res["items_b"]:
+        lines.append(f"Length differs from step_index={min(res['items_a'], res['items_b']) // record_len}")
+    return lines
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Find where two SSB runs first diverge.")
+    ap.add_argument("run_a", help="Run folder or CSV (.csv / .csv.gz / .csv.zst).")
+    ap.add_argument("run_b", help="Run folder or CSV (.csv / .csv.gz / .csv.zst).")
+    ap.add_argument("--file", default="", help="Artifact to compare inside run folders (e.g. cyclic_fatigue.csv).")
+    ap.add_argument("--atol", type=float, default=0.0, help="Absolute tolerance for numeric cells.")
+    ap.add_argument("--rtol", type=float, default=0.0, help="Relative tolerance for numeric cells.")
+    ap.add_argument("--chunk_rows", type=int, default=CHUNK_ROWS, help="Lines read per chunk from each file.")
+    ap.add_argument("--binary", default="", help="Compare raw binary files of this array typecode (e.g. d).")
+    ap.add_argument("--record_len", type=int, default=1, help="Binary mode: items per step.")
+    args = ap.parse_args(argv)
+
+    if args.binary:
+        if args.binary not in array.typecodes:
+            raise SystemExit(f"--binary must be one of: {array.typecodes}")
+        res = diff_binary(args.run_a, args.run_b, args.binary, max(1, args.record_len), args.atol, args.rtol)
+        lines = report_binary(args.run_a, args.run_b, res, args.binary, max(1, args.record_len), args.atol, args.rtol)
+        same = res["stats"]["first"] is None and res["items_a"] == res["items_b"]
+    else:
+        path_a = resolve_input(args.run_a, args.run_b, args.file)
+        path_b = resolve_input(args.run_b, args.run_a, args.file)
+        res = diff_csv(path_a, path_b, args.atol, args.rtol, max(1, args.chunk_rows))
+        lines = report_csv(path_a, path_b, res, args.atol, args.rtol)
+        same = (res["first_row"] is None and res["n_rows_a"] == res["n_rows_b"]
+                and not res["columns_only_a"] and not res["columns_only_b"])
+
+    print("\n".join(lines))
+    return 0 if same else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
 import csv
 import math
 import os
 import datetime
 
+from ssb_io import COMPRESS_EXT, compressed_name, open_csv_write
+from ssb_phase3_envelope import envelope_label, new_tally, tally_envelope, write_summary
+from ssb_sensitivity import SENS_INPUTS, gate_partials, gm_eff_partials, nan_partials, sens_header, tornado_lines
+
 EPS = 1e-12
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_FILES = [os.path.abspath(__file__), os.path.join(SCRIPT_DIR, "ssb_phase3_envelope.py"),
+              os.path.join(SCRIPT_DIR, "ssb_io.py"),
+              os.path.join(SCRIPT_DIR, "ssb_sensitivity.py")]
+
 def safe_run_dir(base_out_dir, case_id, tag):
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     case = str(case_id).strip().replace(" ", "_")
@@ -25,13 +35,6 @@ def clamp01(x):
         return 1.0
     return x
 
-def write_csv(path, header, rows):
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(header)
-        for r in rows:
-            w.writerow(r)
-
 def compute_case(I_T, disp_vol, KB, KG, FSC):
     # BM = I_T / disp_vol
     # KM = KB + BM
@@ -68,7 +71,7 @@ def ssb_gate(GM_eff, GM_safe, a_min, s_old, r_safe, s_max):
 
     return a, r, s, "ALLOW"
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("--out_dir", default="ssb_disp_sweep_out", help="Base output directory.")
     ap.add_argument("--case_id", default="DISP_SWEEP", help="Case label.")
@@ -88,13 +91,40 @@ def main():
     ap.add_argument("--r_safe", type=float, default=0.10, help="Risk tolerance before resistance accumulates.")
     ap.add_argument("--s_max", type=float, default=1.00, help="Maximum allowed resistance.")
 
-    args = ap.parse_args()
+    ap.add_argument("--sensitivity", action="store_true",
+                    help="Add exact partial derivatives of GM_eff, margin, a, r, s w.r.t. I_T, disp_vol, KB, KG, FSC "
+                         "per row, and a tornado ranking to the report.")
+    ap.add_argument("--phase3", action="store_true",
+                    help="Also apply the Phase III envelope inline and write phase3_classification.csv "
+                         "and phase3_summary.txt into the same run folder.")
+    ap.add_argument("--s_warn_frac", type=float, default=0.80,
+                    help="Phase III: restricted envelope starts at this fraction of s_max.")
+    ap.add_argument("--cache_dir", default="",
+                    help="Optional result cache. Identical inputs + code reuse the cached artifacts.")
+    ap.add_argument("--cache_max_mb", type=float, default=0.0,
+                    help="Cache size limit in MB (LRU eviction; 0 = unlimited).")
+    ap.add_argument("--compress", default="none", choices=list(COMPRESS_EXT),
+                    help="Write the run CSVs as .csv.gz / .csv.zst, compressed on a background thread.")
+    ap.add_argument("--catalog", default="", help="Optional SQLite run catalog to register this run in.")
+
+    args = ap.parse_args(argv)
 
     # Base directory exists; each run gets its own unique subfolder
     os.makedirs(args.out_dir, exist_ok=True)
     run_dir = safe_run_dir(args.out_dir, args.case_id, args.tag)
 
-    out_csv = os.path.join(run_dir, "disp_sweep.csv")
+    out_csv = compressed_name(os.path.join(run_dir, "disp_sweep.csv"), args.compress)
+    if args.cache_dir:
+        from ssb_cache import cache_fetch, cache_key, code_version
+
+        cache_id = cache_key("disp_sweep", vars(args), code_version(CODE_FILES))
+        if cache_fetch(args.cache_dir, cache_id, run_dir):
+            if args.catalog:
+                from ssb_catalog import record_from_run_dir, register_run
+
+                register_run(args.catalog, record_from_run_dir(run_dir))
+            return
+
     out_txt = os.path.join(run_dir, "disp_sweep_report.txt")
 
     rows = []
@@ -105,45 +135,8 @@ def main():
     first_ssb_deny = None
     first_classical_unstable = None
 
-    j = 0
-    disp_vol = args.disp_start
-    while disp_vol <= args.disp_end + 0.5 * args.disp_step:
-        comp = compute_case(args.I_T, disp_vol, args.KB, args.KG, args.FSC)
-        if comp is None:
-            BM = KM = GM = GM_eff = float("nan")
-            a = r = float("nan")
-            status = "ABSTAIN"
-            classical = "UNSTABLE"
-            n_abstain += 1
-        else:
-            BM, KM, GM, GM_eff = comp
-            classical = "STABLE" if (is_finite(GM_eff) and GM_eff > 0.0) else "UNSTABLE"
-
-            a, r, s, status = ssb_gate(GM_eff, args.GM_safe, args.a_min, s, args.r_safe, args.s_max)
-            if status == "ALLOW":
-                n_allow += 1
-            elif status == "DENY":
-                n_deny += 1
-            else:
-                n_abstain += 1
-
-            if first_below_safe is None and is_finite(GM_eff) and GM_eff < args.GM_safe:
-                first_below_safe = (disp_vol, GM_eff)
-            if first_ssb_deny is None and status == "DENY":
-                first_ssb_deny = (disp_vol, GM_eff)
-            if first_classical_unstable is None and classical == "UNSTABLE":
-                first_classical_unstable = (disp_vol, GM_eff)
-
-        rows.append([
-            j, args.case_id, args.I_T, disp_vol, args.KB, args.KG, args.FSC,
-            BM, KM, GM, GM_eff,
-            classical,
-            args.GM_safe,
-            a, r, s, status
-        ])
-
-        j += 1
-        disp_vol = args.disp_start + j * args.disp_step
+    ds = [0.0] * len(SENS_INPUTS)
+    sens = []
 
     header = [
         "j","case_id","I_T","disp_vol","KB","KG","FSC",
@@ -152,7 +145,80 @@ def main():
         "GM_safe",
         "a","r","s","SSB_status"
     ]
-    write_csv(out_csv, header, rows)
+    out_header = header + (sens_header() if args.sensitivity else [])
+
+    if args.phase3:
+        out_csv3 = compressed_name(os.path.join(run_dir, "phase3_classification.csv"), args.compress)
+        out_txt3 = os.path.join(run_dir, "phase3_summary.txt")
+        tally = new_tally()
+
+    # Phase II rows (and, with --phase3, their envelope labels) are written as each step is evaluated
+    with contextlib.ExitStack() as outs:
+        w = csv.writer(outs.enter_context(open_csv_write(out_csv)))
+        w.writerow(out_header)
+        w3 = None
+        if args.phase3:
+            w3 = csv.writer(outs.enter_context(open_csv_write(out_csv3)))
+            w3.writerow(out_header + ["PHASE3_envelope"])
+
+        j = 0
+        disp_vol = args.disp_start
+        while disp_vol <= args.disp_end + 0.5 * args.disp_step:
+            comp = compute_case(args.I_T, disp_vol, args.KB, args.KG, args.FSC)
+            if comp is None:
+                BM = KM = GM = GM_eff = float("nan")
+                a = r = float("nan")
+                status = "ABSTAIN"
+                classical = "UNSTABLE"
+                n_abstain += 1
+            else:
+                BM, KM, GM, GM_eff = comp
+                classical = "STABLE" if (is_finite(GM_eff) and GM_eff > 0.0) else "UNSTABLE"
+
+                a, r, s, status = ssb_gate(GM_eff, args.GM_safe, args.a_min, s, args.r_safe, args.s_max)
+                if status == "ALLOW":
+                    n_allow += 1
+                elif status == "DENY":
+                    n_deny += 1
+                else:
+                    n_abstain += 1
+
+                if first_below_safe is None and is_finite(GM_eff) and GM_eff < args.GM_safe:
+                    first_below_safe = (disp_vol, GM_eff)
+                if first_ssb_deny is None and status == "DENY":
+                    first_ssb_deny = (disp_vol, GM_eff)
+                if first_classical_unstable is None and classical == "UNSTABLE":
+                    first_classical_unstable = (disp_vol, GM_eff)
+
+            rows.append([
+                j, args.case_id, args.I_T, disp_vol, args.KB, args.KG, args.FSC,
+                BM, KM, GM, GM_eff,
+                classical,
+                args.GM_safe,
+                a, r, s, status
+            ])
+
+            if args.sensitivity:
+                if comp is None:
+                    sens.append(nan_partials() * 4 + ds)
+                else:
+                    dGM = gm_eff_partials(args.I_T, disp_vol)
+                    dmargin, da, dr, ds = gate_partials(dGM, GM_eff, args.GM_safe, args.r_safe, ds)
+                    sens.append(dGM + dmargin + da + dr + ds)
+
+            row = rows[-1]
+            out_row = row + sens[-1] if args.sensitivity else row
+            w.writerow(out_row)
+            if w3 is not None:
+                env = envelope_label(row[-1], row[-4], row[-2], args.a_min, args.s_max, args.s_warn_frac)
+                w3.writerow(out_row + [env])
+                tally_envelope(tally, env)
+
+            j += 1
+            disp_vol = args.disp_start + j * args.disp_step
+
+    if args.phase3:
+        write_summary(out_txt3, out_csv, args.a_min, args.s_max, args.s_warn_frac, tally, out_csv3)
 
     def fmt_hit(label, hit):
         if hit is None:
@@ -181,12 +247,52 @@ def main():
     lines.append(fmt_hit("First SSB DENY", first_ssb_deny))
     lines.append(fmt_hit("First Classical UNSTABLE (GM_eff<=0)", first_classical_unstable))
     lines.append("")
+
+    if args.sensitivity:
+        k = next((k for k, row in enumerate(rows) if row[-1] == "DENY"), len(rows) - 1)
+        if k >= 0:
+            x_vals = [rows[k][header.index(c)] for c in ["I_T", "disp_vol", "KB", "KG", "FSC"]]
+            n = len(SENS_INPUTS)
+            where = f"{'first DENY' if rows[k][-1] == 'DENY' else 'last row'} j={k}"
+            lines.extend(tornado_lines(where, x_vals, sens[k][n:2 * n], sens[k][4 * n:]))
+            lines.append("")
     lines.append("Outputs:")
     lines.append(f" - {out_csv}")
     lines.append(f" - {out_txt}")
+    if args.phase3:
+        lines.append(f" - {out_csv3}")
+        lines.append(f" - {out_txt3}")
 
     with open(out_txt, "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
 
+    if args.catalog:
+        from ssb_catalog import register_run, run_record
+
+        first = next((k for k, row in enumerate(rows) if row[-1] == "DENY"), None)
+        fields = dict(
+            n_rows=len(rows),
+            n_allow=sum(1 for row in rows if row[-1] == "ALLOW"),
+            n_deny=sum(1 for row in rows if row[-1] == "DENY"),
+            n_abstain=sum(1 for row in rows if row[-1] == "ABSTAIN"),
+            first_deny=first,
+            first_deny_x=None if first is None else rows[first][header.index("disp_vol")],
+            final_s=rows[-1][-2] if rows else None,
+            csv_path=os.path.abspath(out_csv), report_path=os.path.abspath(out_txt),
+        )
+        if rows:
+            fields.update(disp_end=rows[-1][3])
+        if args.phase3:
+            fields.update(s_warn_frac=args.s_warn_frac,
+                          n_restricted=tally["counts"]["ALLOW_RESTRICTED_MONITOR"],
+                          first_restricted=tally["first_restricted"],
+                          phase3_csv_path=os.path.abspath(out_csv3))
+        register_run(args.catalog, run_record(run_dir, "disp_sweep", vars(args), **fields))
+
+    if args.cache_dir:
+        from ssb_cache import cache_store
+
+        cache_store(args.cache_dir, cache_id, run_dir, args.cache_max_mb)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+SSB streaming CSV I/O with optional compression.
+
+The codec follows the file name:
+  *.csv      plain text
+  *.csv.gz   gzip (standard library)
+  *.csv.zst  zstd (needs the 'zstandard' package)
+
+Writers hand encoded chunks to a background thread through a bounded queue;
+the thread runs the compressor and the file writes, so the producing loop only
+pays for csv formatting. gzip output uses mtime=0, so identical rows give
+byte-identical files (cache keys and run diffs stay stable).
+
+Readers decompress while streaming; nothing is inflated to disk or memory.
+"""
+
+import gzip
+import io
+import os
+import queue
+import threading
+
+COMPRESS_EXT = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+CHUNK_BYTES = 1 << 16
+QUEUE_CHUNKS = 64
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+def compressed_name(path, compress):
+    return path + COMPRESS_EXT[compress]
+
+def csv_variants(name):
+    # The names a CSV artifact may have on disk, plain first.
+    return [name + ext for ext in ["", ".gz", ".zst"]]
+
+def find_csv(run_dir, name):
+    # Path of `name` (or its .gz / .zst form) inside run_dir, or None.
+    for n in csv_variants(name):
+        p = os.path.join(run_dir, n)
+        if os.path.isfile(p):
+            return p
+    return None
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise SystemExit("zstd (.zst) files need the 'zstandard' package: pip install zstandard")
+    return zstandard
+
+class _ThreadedSink(io.RawIOBase):
+    # Raw byte sink: write() enqueues, a worker thread compresses and writes.
+
+    def __init__(self, path, codec):
+        self._q = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._err = None
+        zstd = _zstandard() if codec == "zstd" else None
+        self._raw = open(path, "wb")
+        if zstd is None:
+            self._z = gzip.GzipFile(filename="", mode="wb", compresslevel=GZIP_LEVEL, fileobj=self._raw, mtime=0)
+        else:
+            self._z = zstd.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(self._raw, closefd=False)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            chunk = self._q.get()
+            if chunk is None:
+                break
+            if self._err is None:
+                try:
+                    self._z.write(chunk)
+                except BaseException as e:
+                    # Keep consuming so the producer never blocks on a full queue
+                    self._err = e
+        try:
+            self._z.close()
+        except BaseException as e:
+            if self._err is None:
+                self._err = e
+        self._raw.close()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if self._err is not None:
+            raise self._err
+        self._q.put(bytes(b))
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            self._q.put(None)
+            self._thread.join()
+            super().close()
+            if self._err is not None:
+                raise self._err
+
+def open_csv_write(path):
+    # Text-mode writer for csv.writer; compression chosen by extension.
+    if path.endswith(".gz"):
+        codec = "gzip"
+    elif path.endswith(".zst"):
+        codec = "zstd"
+    else:
+        return open(path, "w", newline="", encoding="utf-8")
+    buf = io.BufferedWriter(_ThreadedSink(path, codec), buffer_size=CHUNK_BYTES)
+    return io.TextIOWrapper(buf, encoding="utf-8", newline="")
+
+def open_csv_read(path):
+    # Text-mode streaming reader for csv.reader / csv.DictReader.
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.endswith(".zst"):
+        raw = open(path, "rb")
+        try:
+            stream = _zstandard().ZstdDecompressor().stream_reader(raw, closefd=True)
+        except BaseException:
+            raw.close()
+            raise
+        return io.TextIOWrapper(io.BufferedReader(stream, buffer_size=CHUNK_BYTES), encoding="utf-8", newline="")
+    return open(path, "r", newline="", encoding="utf-8")
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+SSB allowable-KG / allowable-FSC limit curves.
+
+For every displacement ∇ on a grid, the largest KG (FSC held fixed) and the
+largest FSC (KG held fixed) for which the SSB gate still ALLOWs.
+
+Single-step criterion (closed form, s_old = 0):
+  ALLOW  <=>  GM_eff > 0  and  margin >= a_min  and  1 - margin - r_safe <= s_max
+  GM_eff_req = GM_safe * max(a_min, 1 - r_safe - s_max)
+  KG_max(∇)  = KB + I_T/∇ - FSC - GM_eff_req
+  FSC_max(∇) = KB + I_T/∇ - KG  - GM_eff_req
+Each closed-form value is checked against ssb_gate and nudged by single ulps
+(math.nextafter) so it is the last ALLOW value in floating point.
+
+Stateful criterion (--stateful):
+  s accumulates along the ∇ grid exactly as in ssb_disp_sweep.py. The limit at
+  row j is the largest KG (FSC) for which rows 0..j contain no DENY. s is
+  piecewise linear in KG (FSC), so the limit is solved directly and verified
+  against the real accumulation, with bisection as the fallback.
+"""
+
+import argparse
+import bisect
+import csv
+import math
+import os
+import datetime
+
+from ssb_io import COMPRESS_EXT, compressed_name, open_csv_write
+
+EPS = 1e-12
+NUDGE_STEPS = 64
+
+def safe_run_dir(base_out_dir, case_id, tag):
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    case = str(case_id).strip().replace(" ", "_")
+    tg = str(tag).strip().replace(" ", "_") if str(tag).strip() else "RUN"
+    run_dir = os.path.join(base_out_dir, f"{ts}__{case}__{tg}")
+    os.makedirs(run_dir, exist_ok=False)
+    return run_dir
+
+def is_finite(x):
+    return isinstance(x, (int, float)) and math.isfinite(x)
+
+def clamp01(x):
+    if x < 0.0:
+        return 0.0
+    if x > 1.0:
+        return 1.0
+    return x
+
+def write_csv(path, header, rows):
+    with open_csv_write(path) as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        for r in rows:
+            w.writerow(r)
+
+def compute_case(I_T, disp_vol, KB, KG, FSC):
+    # BM = I_T / disp_vol
+    # KM = KB + BM
+    # GM = KM - KG
+    # GM_eff = GM - FSC
+    if not (is_finite(I_T) and is_finite(disp_vol) and is_finite(KB) and is_finite(KG) and is_finite(FSC)):
+        return None
+    if disp_vol <= 0.0 or I_T <= 0.0:
+        return None
+    BM = I_T / disp_vol
+    KM = KB + BM
+    GM = KM - KG
+    GM_eff = GM - FSC
+    return BM, KM, GM, GM_eff
+
+def ssb_gate(GM_eff, GM_safe, a_min, s_old, r_safe, s_max):
+    # margin = GM_eff / GM_safe
+    # a = clamp01(margin)
+    # r = max(0, 1 - margin)
+    # s = s_old + max(0, r - r_safe)
+    margin = GM_eff / max(GM_safe, EPS)
+    a = clamp01(margin)
+    r = max(0.0, 1.0 - margin)
+    s = s_old + max(0.0, r - r_safe)
+
+    if not is_finite(GM_eff):
+        return float("nan"), float("nan"), float("nan"), "ABSTAIN"
+
+    if GM_eff <= 0.0:
+        return a, r, s, "DENY"
+
+    if (a < a_min) or (s > s_max):
+        return a, r, s, "DENY"
+
+    return a, r, s, "ALLOW"
+
+def disp_grid(start, end, step):
+    out = []
+    j = 0
+    disp_vol = start
+    while disp_vol <= end + 0.5 * step:
+        out.append(disp_vol)
+        j += 1
+        disp_vol = start + j * step
+    return out
+
+def gm_eff_required(args):
+    return max(args.GM_safe, EPS) * max(args.a_min, 1.0 - args.r_safe - args.s_max)
+
+def allows(args, disp_vol, KG, FSC):
+    comp = compute_case(args.I_T, disp_vol, args.KB, KG, FSC)
+    if comp is None:
+        return False
+    return ssb_gate(comp[3], args.GM_safe, args.a_min, 0.0, args.r_safe, args.s_max)[3] == "ALLOW"
+
+def last_allowed(ok, x0, lo_hint):
+    # Largest float x with ok(x), starting from the closed-form estimate x0.
+    # ok must be True below the limit and False above it.
+    x = x0
+    for _ in range(NUDGE_STEPS):
+        if ok(x):
+            break
+        x = math.nextafter(x, -math.inf)
+    else:
+        return bisect_last(ok, lo_hint, x0)
+    for _ in range(NUDGE_STEPS):
+        up = math.nextafter(x, math.inf)
+        if not ok(up):
+            return x
+        x = up
+    return bisect_last(ok, x, x0 + abs(x0) + 1.0)
+
+def bisect_last(ok, lo, hi):
+    # ok(lo) is True, ok(hi) is False; returns the last True float.
+    if not ok(lo):
+        return float("nan")
+    while True:
+        mid = lo + 0.5 * (hi - lo)
+        if mid <= lo or mid >= hi:
+            return lo
+        if ok(mid):
+            lo = mid
+        else:
+            hi = mid
+
+def sweep_gm_eff(KM, vary, x, fixed):
+    # GM_eff with the same operations (and rounding) as compute_case
+    if vary == "KG":
+        return (KM - x) - fixed
+    return (KM - fixed) - x
+
+def sweep_ok(args, KMs, vary, fixed, j, x):
+    # True if rows 0..j contain no DENY with s accumulating along the grid
+    # (ssb_disp_sweep.py semantics). KMs[i] is KB + I_T / grid[i], None where
+    # compute_case skips the row.
+    #
+    # The grid is increasing, so KM and GM_eff never increase along it: row j has
+    # the smallest margin, every s increment is at least the one before it, and
+    # s never decreases. Row j therefore DENYs whenever an earlier row does, and
+    # only the rows from the first positive increment onwards move s off 0.0.
+    # That first row is found by bisection; the rest is replayed exactly.
+    if not (is_finite(x) and is_finite(fixed)):
+        return True  # compute_case skips every row
+
+    def inc(i):
+        if KMs[i] is None:
+            return 0.0
+        return ssb_gate(sweep_gm_eff(KMs[i], vary, x, fixed), args.GM_safe, args.a_min, 0.0,
+                        args.r_safe, args.s_max)[2]
+
+    lo, hi = 0, j
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if inc(mid) > 0.0:
+            hi = mid
+        else:
+            lo = mid + 1
+    s = 0.0
+    for i in range(lo, j + 1):
+        GM_eff = sweep_gm_eff(KMs[i], vary, x, fixed)
+        _, _, s, status = ssb_gate(GM_eff, args.GM_safe, args.a_min, s, args.r_safe, args.s_max)
+    return status != "DENY"
+
+def s_limit(cs, target):
+    # Largest x with sum(max(0, x - c) for c in cs) <= target; cs sorted ascending.
+    if target < 0.0:
+        return float("nan")
+    if not cs:
+        return math.inf
+    total = 0.0
+    for k, c in enumerate(cs, 1):
+        total += c
+        x = (target + total) / k
+        if k == len(cs) or x <= cs[k]:
+            return x
+    return math.inf
+
+def stateful_limits(args, grid, static, vary):
+    # vary = "KG" or "FSC"; static = single-step limits on the same grid.
+    #
+    # With r_safe >= 0 the increment at row i is max(0, x - c_i) / GM_safe, where
+    # c_i = KM_i - fixed - GM_safe * (1 - r_safe). s never decreases along the grid,
+    # so "no DENY in rows 0..j" is: x <= every single-step limit so far and
+    # s_j(x) <= s_max, which s_limit solves from the sorted c_i. The estimate is
+    # then verified against the real accumulation and nudged by ulps.
+    g = max(args.GM_safe, EPS)
+    fixed = args.FSC if vary == "KG" else args.KG
+    req_safe = g * max(args.a_min, 1.0 - args.r_safe, 0.0)
+    closed_form = args.r_safe >= 0.0
+
+    comps = [compute_case(args.I_T, disp_vol, args.KB, 0.0, 0.0) for disp_vol in grid]
+    KMs = [None if comp is None else comp[1] for comp in comps]
+
+    out = []
+    cs = []
+    prev = math.inf
+    floor = math.inf
+    for j, comp in enumerate(comps):
+        if comp is None or not is_finite(static[j]):
+            out.append(prev if math.isfinite(prev) else float("nan"))
+            continue
+        if math.isnan(prev):
+            # Some earlier row DENYs for every value, so every later row does too
+            out.append(prev)
+            continue
+        KM = comp[1]
+        # Below this value every row so far has margin >= max(a_min, 1 - r_safe): no s growth, no DENY
+        floor = min(floor, KM - fixed - req_safe - g)
+        hi = min(static[j], prev)
+        ok = lambda x, j=j: sweep_ok(args, KMs, vary, fixed, j, x)
+        if closed_form:
+            bisect.insort(cs, KM - fixed - g * (1.0 - args.r_safe))
+            est = min(hi, s_limit(cs, g * args.s_max))
+            lim = last_allowed(ok, est, floor) if is_finite(est) else float("nan")
+        elif ok(hi):
+            lim = hi
+        else:
+            # r_safe < 0: s grows by at least -r_safe per row whatever the loading,
+            # so there may be no allowed value at all; stop once lo leaves the floats.
+            lo = floor
+            while math.isfinite(lo) and not ok(lo):
+                lo -= abs(hi - lo) + 1.0
+            lim = bisect_last(ok, lo, hi) if math.isfinite(lo) else float("nan")
+        out.append(lim)
+        prev = lim
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out_dir", default="ssb_limit_curves_out", help="Base output directory.")
+    ap.add_argument("--case_id", default="LIMIT_CURVES", help="Case label.")
+    ap.add_argument("--tag", default="", help="Optional run tag.")
+
+    ap.add_argument("--I_T", type=float, default=3.60, help="Waterplane second moment I_T (m^4).")
+    ap.add_argument("--KB", type=float, default=0.55, help="KB (m).")
+    ap.add_argument("--KG", type=float, default=0.90, help="KG (m), held fixed for the FSC limit.")
+    ap.add_argument("--FSC", type=float, default=0.00, help="Free surface correction FSC (m), held fixed for the KG limit.")
+
+    ap.add_argument("--disp_start", type=float, default=5.0, help="Start displaced volume ∇ (m^3).")
+    ap.add_argument("--disp_end", type=float, default=12.0, help="End displaced volume ∇ (m^3).")
+    ap.add_argument("--disp_step", type=float, default=0.01, help="Step for ∇ (m^3).")
+
+    ap.add_argument("--GM_safe", type=float, default=0.15, help="Declared safe GM_eff threshold (m).")
+    ap.add_argument("--a_min", type=float, default=0.70, help="Minimum permission.")
+    ap.add_argument("--r_safe", type=float, default=0.10, help="Risk tolerance before resistance accumulates.")
+    ap.add_argument("--s_max", type=float, default=1.00, help="Maximum allowed resistance.")
+
+    ap.add_argument("--stateful", action="store_true",
+                    help="Also compute the limits with s accumulating along the ∇ grid (ssb_disp_sweep.py semantics).")
+    ap.add_argument("--compress", default="none", choices=list(COMPRESS_EXT),
+                    help="Write the limit table as .csv.gz / .csv.zst, compressed on a background thread.")
+
+    args = ap.parse_args(argv)
+
+    if not (args.disp_step > 0.0):
+        raise SystemExit("disp_step must be > 0.")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    run_dir = safe_run_dir(args.out_dir, args.case_id, args.tag)
+    out_csv = compressed_name(os.path.join(run_dir, "limit_curves.csv"), args.compress)
+    out_txt = os.path.join(run_dir, "limit_curves_report.txt")
+
+    grid = disp_grid(args.disp_start, args.disp_end, args.disp_step)
+    req = gm_eff_required(args)
+    feasible = args.a_min <= 1.0
+
+    BMs = [args.I_T / d if (d > 0.0 and args.I_T > 0.0) else float("nan") for d in grid]
+    KG_est = [args.KB + bm - args.FSC - max(req, 0.0) for bm in BMs]
+    FSC_est = [args.KB + bm - args.KG - max(req, 0.0) for bm in BMs]
+
+    KG_max = []
+    FSC_max = []
+    for d, kg0, fsc0 in zip(grid, KG_est, FSC_est):
+        if not (feasible and is_finite(kg0)):
+            KG_max.append(float("nan"))
+            FSC_max.append(float("nan"))
+            continue
+        span = args.GM_safe + abs(kg0) + 1.0
+        KG_max.append(last_allowed(lambda x: allows(args, d, x, args.FSC), kg0, kg0 - span))
+        FSC_max.append(last_allowed(lambda x: allows(args, d, args.KG, x), fsc0, fsc0 - span))
+
+    header = ["j", "disp_vol", "BM", "GM_eff_req", "KG_max", "FSC_max"]
+    if args.stateful:
+        KG_sweep = stateful_limits(args, grid, KG_max, "KG")
+        FSC_sweep = stateful_limits(args, grid, FSC_max, "FSC")
+        header += ["KG_max_sweep", "FSC_max_sweep"]
+
+    rows = []
+    for j, d in enumerate(grid):
+        row = [j, d, BMs[j], req, KG_max[j], FSC_max[j]]
+        if args.stateful:
+            row += [KG_sweep[j], FSC_sweep[j]]
+        rows.append(row)
+    write_csv(out_csv, header, rows)
+
+    def fmt_range(label, vals):
+        fin = [(v, d) for v, d in zip(vals, grid) if is_finite(v)]
+        if not fin:
+            return f"{label}: (none)"
+        lo = min(fin)
+        hi = max(fin)
+        return f"{label}: min={lo[0]:.6f} at disp_vol={lo[1]:.6f}  max={hi[0]:.6f} at disp_vol={hi[1]:.6f}"
+
+    def first_binding(label, sweep, static):
+        for d, a, b in zip(grid, sweep, static):
+            if is_finite(a) and is_finite(b) and a < b:
+                return f"{label}: s_max binds from disp_vol={d:.6f} (limit {a:.6f} < single-step {b:.6f})"
+        return f"{label}: s_max never binds on this grid"
+
+    lines = []
+    lines.append("SSB LIMIT CURVES — DETERMINISTIC REPORT")
+    lines.append("")
+    lines.append(f"case_id: {args.case_id}")
+    lines.append(f"I_T (m^4): {args.I_T}")
+    lines.append(f"KB (m): {args.KB}")
+    lines.append(f"KG (m): {args.KG}  (fixed for FSC_max)")
+    lines.append(f"FSC (m): {args.FSC}  (fixed for KG_max)")
+    lines.append("")
+    lines.append(f"disp_vol ∇ grid: {args.disp_start} .. {args.disp_end} step {args.disp_step}  ({len(grid)} points)")
+    lines.append("")
+    lines.append(f"SSB thresholds: GM_safe={args.GM_safe}  a_min={args.a_min}  r_safe={args.r_safe}  s_max={args.s_max}")
+    lines.append(f"GM_eff_req = GM_safe * max(a_min, 1 - r_safe - s_max) = {req:.6f}  (and GM_eff > 0)")
+    if not feasible:
+        lines.append("a_min > 1: no loading is ever ALLOWed; limits are NaN.")
+    lines.append("")
+    lines.append(fmt_range("KG_max", KG_max))
+    lines.append(fmt_range("FSC_max", FSC_max))
+    if args.stateful:
+        lines.append("")
+        lines.append(fmt_range("KG_max_sweep", KG_sweep))
+        lines.append(fmt_range("FSC_max_sweep", FSC_sweep))
+        lines.append(first_binding("KG", KG_sweep, KG_max))
+        lines.append(first_binding("FSC", FSC_sweep, FSC_max))
+    lines.append("")
+    lines.append("Negative FSC_max means the gate DENYs even with no free-surface correction.")
+    lines.append("")
+    lines.append("Outputs:")
+    lines.append(f" - {out_csv}")
+    lines.append(f" - {out_txt}")
+
+    with open(out_txt, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import glob
 import math
 import os
 import datetime
 
+from ssb_io import COMPRESS_EXT, compressed_name, csv_variants, find_csv, open_csv_read, open_csv_write
+
 EPS = 1e-12
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_FILES = [os.path.abspath(__file__), os.path.join(SCRIPT_DIR, "ssb_io.py")]
+
+# Phase II artifacts picked up when --in_csv names a directory (also as .gz / .zst)
+PHASE2_CSVS = ["disp_sweep.csv", "multifsc_ladder.csv", "cyclic_fatigue.csv"]
+
 def safe_run_dir(base_out_dir, case_id, tag):
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     case = str(case_id).strip().replace(" ", "_")
@@ -54,26 +63,72 @@ def envelope_label(ssb_status, a, s, a_min, s_max, s_warn_frac):
 
     return "ALLOW_NORMAL"
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--in_csv", required=True, help="Input CSV from a Phase-II run (disp_sweep/multifsc/cyclic).")
-    ap.add_argument("--out_dir", default="ssb_phase3_out", help="Output directory.")
-    ap.add_argument("--case_id", default="PHASE3", help="Case label.")
-    ap.add_argument("--tag", default="PHASE3_ENVELOPE", help="Run tag.")
+PHASE3_LABELS = ["ALLOW_NORMAL","ALLOW_RESTRICTED_MONITOR","DENY_FINAL","ABSTAIN_HUMAN_REVIEW"]
 
-    # These must match the run's declared thresholds (from the report)
-    ap.add_argument("--a_min", type=float, default=0.70, help="Minimum permission threshold used in Phase-II.")
-    ap.add_argument("--s_max", type=float, default=1.00, help="Max resistance used in Phase-II.")
-    ap.add_argument("--s_warn_frac", type=float, default=0.80, help="Restricted envelope starts at this fraction of s_max.")
+def new_tally():
+    return {
+        "n": 0,
+        "counts": {k: 0 for k in PHASE3_LABELS},
+        "first_restricted": None,
+        "first_deny": None,
+        "first_abstain": None,
+    }
 
-    args = ap.parse_args()
-    os.makedirs(args.out_dir, exist_ok=True)
-    run_dir = safe_run_dir(args.out_dir, args.case_id, args.tag)
+def tally_envelope(tally, env):
+    idx = tally["n"]
+    tally["counts"][env] = tally["counts"].get(env, 0) + 1
 
-    out_csv = os.path.join(run_dir, "phase3_classification.csv")
-    out_txt = os.path.join(run_dir, "phase3_summary.txt")
+    if tally["first_restricted"] is None and env == "ALLOW_RESTRICTED_MONITOR":
+        tally["first_restricted"] = idx
+    if tally["first_deny"] is None and env == "DENY_FINAL":
+        tally["first_deny"] = idx
+    if tally["first_abstain"] is None and env == "ABSTAIN_HUMAN_REVIEW":
+        tally["first_abstain"] = idx
+
+    tally["n"] = idx + 1
+
+def merge_tally(tally, part):
+    # Append a tally computed over the rows that directly follow `tally`'s rows.
+    for k, v in part["counts"].items():
+        tally["counts"][k] = tally["counts"].get(k, 0) + v
+    for k in ["first_restricted", "first_deny", "first_abstain"]:
+        if tally[k] is None and part[k] is not None:
+            tally[k] = tally["n"] + part[k]
+    tally["n"] += part["n"]
+
+def write_summary(out_txt, in_csv, a_min, s_max, s_warn_frac, tally, out_csv):
+    def fmt_first(label, v):
+        return f"{label}: (not reached)" if v is None else f"{label}: row_index={v}"
+
+    counts = tally["counts"]
+
+    lines = []
+    lines.append("SSB PHASE III — ENVELOPE CLASSIFICATION REPORT")
+    lines.append("")
+    lines.append(f"input_csv: {in_csv}")
+    lines.append(f"a_min: {a_min}")
+    lines.append(f"s_max: {s_max}")
+    lines.append(f"s_warn_frac: {s_warn_frac}")
+    lines.append("")
+    lines.append("Counts:")
+    for k in PHASE3_LABELS:
+        lines.append(f" - {k}: {counts.get(k,0)}")
+    lines.append("")
+    lines.append(fmt_first("First Restricted", tally["first_restricted"]))
+    lines.append(fmt_first("First Deny", tally["first_deny"]))
+    lines.append(fmt_first("First Abstain", tally["first_abstain"]))
+    lines.append("")
+    lines.append("Outputs:")
+    lines.append(f" - {out_csv}")
+    lines.append(f" - {out_txt}")
+
+    with open(out_txt, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
 
-    with open(args.in_csv, "r", encoding="utf-8") as f:
+def classify_csv(in_csv, out_csv, a_min, s_max, s_warn_frac):
+    tally = new_tally()
+
+    with open_csv_read(in_csv) as f, open_csv_write(out_csv) as g:
         r = csv.DictReader(f)
         fieldnames = list(r.fieldnames) if r.fieldnames else []
         # Expected common columns from your scripts:
@@ -86,65 +141,277 @@ def main():
             if c not in fieldnames:
                 fieldnames.append(c)
 
-        rows = []
-        counts = {"ALLOW_NORMAL":0, "ALLOW_RESTRICTED_MONITOR":0, "DENY_FINAL":0, "ABSTAIN_HUMAN_REVIEW":0}
-
-        first_restricted = None
-        first_deny = None
-        first_abstain = None
+        w = csv.DictWriter(g, fieldnames=fieldnames)
+        w.writeheader()
 
-        idx = 0
         for row in r:
             a = parse_float(row.get("a", "nan"))
             s = parse_float(row.get("s", "nan"))
             status = (row.get("SSB_status", "") or "").strip().upper()
 
-            env = envelope_label(status, a, s, args.a_min, args.s_max, args.s_warn_frac)
+            env = envelope_label(status, a, s, a_min, s_max, s_warn_frac)
             row["PHASE3_envelope"] = env
-            rows.append(row)
+            w.writerow(row)
+
+            tally_envelope(tally, env)
+
+    return tally
+
+# --- Batch mode: many Phase II CSVs under directories / glob patterns ---
+
+def discover_inputs(patterns):
+    # Explicit files are taken as given; directories are walked for PHASE2_CSVS.
+    # Order is deterministic (pattern order, then sorted walk) and duplicates are dropped.
+    seen = set()
+    out = []
+    for pat in patterns:
+        paths = sorted(glob.glob(pat, recursive=True)) if glob.has_magic(pat) else [pat]
+        for path in paths:
+            if os.path.isdir(path):
+                found = []
+                for dirpath, dirnames, filenames in os.walk(path):
+                    dirnames.sort()
+                    for name in PHASE2_CSVS:
+                        found.extend(os.path.join(dirpath, n) for n in csv_variants(name) if n in filenames)
+            else:
+                found = [path]
+            for f in found:
+                key = os.path.abspath(f)
+                if key not in seen:
+                    seen.add(key)
+                    out.append(f)
+    return out
+
+def batch_run_names(in_csvs):
+    # Per-run folder = the source run folder's name, so it keeps the
+    # <YYYYMMDD_HHMMSS>__<case_id>__<tag> form; repeats get a numeric suffix.
+    names = []
+    used = {}
+    for path in in_csvs:
+        base = os.path.basename(os.path.dirname(os.path.abspath(path))) or "RUN"
+        n = used.get(base, 0)
+        used[base] = n + 1
+        names.append(base if n == 0 else f"{base}_{n + 1}")
+    return names
+
+def classify_job(job):
+    # Runs in a worker process; errors are returned, not raised, so one bad file
+    # does not abort the batch.
+    k, in_csv, run_dir, a_min, s_max, s_warn_frac, case_id, compress, cache_dir, cache_max_mb = job
+    try:
+        os.makedirs(run_dir, exist_ok=False)
+        cache_id = None
+        if cache_dir:
+            from ssb_cache import cache_fetch, cache_key, code_version, file_digest
 
-            counts[env] = counts.get(env, 0) + 1
+            params = {"case_id": case_id, "a_min": a_min, "s_max": s_max, "s_warn_frac": s_warn_frac,
+                      "compress": compress, "in_csv": file_digest(in_csv)}
+            cache_id = cache_key("phase3", params, code_version(CODE_FILES))
+            if cache_fetch(cache_dir, cache_id, run_dir, {"input_csv": in_csv}):
+                return k, tally_from_csv(find_csv(run_dir, "phase3_classification.csv")), None
 
-            if first_restricted is None and env == "ALLOW_RESTRICTED_MONITOR":
-                first_restricted = idx
-            if first_deny is None and env == "DENY_FINAL":
-                first_deny = idx
-            if first_abstain is None and env == "ABSTAIN_HUMAN_REVIEW":
-                first_abstain = idx
+        out_csv = compressed_name(os.path.join(run_dir, "phase3_classification.csv"), compress)
+        out_txt = os.path.join(run_dir, "phase3_summary.txt")
+        tally = classify_csv(in_csv, out_csv, a_min, s_max, s_warn_frac)
+        write_summary(out_txt, in_csv, a_min, s_max, s_warn_frac, tally, out_csv)
 
-            idx += 1
+        if cache_id is not None:
+            from ssb_cache import cache_store
 
+            cache_store(cache_dir, cache_id, run_dir, cache_max_mb, {"input_csv": in_csv})
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return k, None, f"{type(e).__name__}: {e}"
+    return k, tally, None
+
+def tally_from_csv(path):
+    tally = new_tally()
+    with open_csv_read(path) as f:
+        for row in csv.DictReader(f):
+            tally_envelope(tally, row.get("PHASE3_envelope", ""))
+    return tally
+
+def run_jobs(jobs, workers, max_in_flight):
+    # Yields classify_job results in completion order with at most max_in_flight
+    # files submitted at once, so the pending queue stays small for huge archives.
+    if workers <= 1:
+        for job in jobs:
+            yield classify_job(job)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    it = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = set()
+        for job in it:
+            pending.add(ex.submit(classify_job, job))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+        for fut in pending:
+            yield fut.result()
+
+def run_batch(args, run_dir, in_csvs):
+    names = batch_run_names(in_csvs)
+    jobs = [(k, p, os.path.join(run_dir, names[k]), args.a_min, args.s_max, args.s_warn_frac,
+             args.case_id, args.compress, args.cache_dir, args.cache_max_mb) for k, p in enumerate(in_csvs)]
+    workers = max(1, args.workers)
+    max_in_flight = max(1, args.max_in_flight or 2 * workers)
+
+    results = [None] * len(jobs)
+    con = None
+    if args.catalog:
+        from ssb_catalog import connect, record_from_run_dir, upsert
+
+        con = connect(args.catalog)
+
+    try:
+        for k, tally, err in run_jobs(jobs, workers, max_in_flight):
+            results[k] = (tally, err)
+            if err is not None:
+                print(f"ERROR: {in_csvs[k]}: {err}")
+            elif con is not None:
+                # One writer: the catalog is only touched from this process
+                with con:
+                    upsert(con, [record_from_run_dir(jobs[k][2])])
+    finally:
+        if con is not None:
+            con.close()
+
+    write_batch_summary(args, run_dir, in_csvs, names, results)
+    return all(err is None for _, err in results)
+
+def write_batch_summary(args, run_dir, in_csvs, names, results):
+    out_csv = os.path.join(run_dir, "phase3_batch_summary.csv")
+    out_txt = os.path.join(run_dir, "phase3_batch_summary.txt")
+
+    total = new_tally()
+    n_err = 0
+    n_deny = 0
+    first_denies = []
     with open(out_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for row in rows:
-            w.writerow(row)
+        w = csv.writer(f)
+        w.writerow(["run", "in_csv", "n_rows"] + PHASE3_LABELS +
+                   ["first_restricted", "first_deny", "first_abstain", "error"])
+        for name, in_csv, (tally, err) in zip(names, in_csvs, results):
+            if err is not None:
+                n_err += 1
+                w.writerow([name, in_csv, ""] + [""] * len(PHASE3_LABELS) + ["", "", "", err])
+                continue
+            for k in PHASE3_LABELS:
+                total["counts"][k] += tally["counts"].get(k, 0)
+            total["n"] += tally["n"]
+            if tally["first_deny"] is not None:
+                n_deny += 1
+                first_denies.append(tally["first_deny"])
+            firsts = ["" if tally[k] is None else tally[k] for k in ["first_restricted", "first_deny", "first_abstain"]]
+            w.writerow([name, in_csv, tally["n"]] + [tally["counts"].get(k, 0) for k in PHASE3_LABELS] + firsts + [""])
 
-    def fmt_first(label, v):
-        return f"{label}: (not reached)" if v is None else f"{label}: row_index={v}"
+    n_ok = len(in_csvs) - n_err
 
     lines = []
-    lines.append("SSB PHASE III — ENVELOPE CLASSIFICATION REPORT")
+    lines.append("SSB PHASE III — BATCH ENVELOPE CLASSIFICATION REPORT")
     lines.append("")
-    lines.append(f"input_csv: {args.in_csv}")
+    lines.append(f"inputs: {' '.join(args.in_csv)}")
     lines.append(f"a_min: {args.a_min}")
     lines.append(f"s_max: {args.s_max}")
     lines.append(f"s_warn_frac: {args.s_warn_frac}")
     lines.append("")
-    lines.append("Counts:")
-    for k in ["ALLOW_NORMAL","ALLOW_RESTRICTED_MONITOR","DENY_FINAL","ABSTAIN_HUMAN_REVIEW"]:
-        lines.append(f" - {k}: {counts.get(k,0)}")
+    lines.append(f"Files classified: {n_ok} of {len(in_csvs)}  (failed: {n_err})")
+    lines.append(f"Rows classified: {total['n']}")
+    lines.append("")
+    lines.append("Counts (all files):")
+    for k in PHASE3_LABELS:
+        lines.append(f" - {k}: {total['counts'][k]}")
     lines.append("")
-    lines.append(fmt_first("First Restricted", first_restricted))
-    lines.append(fmt_first("First Deny", first_deny))
-    lines.append(fmt_first("First Abstain", first_abstain))
+    lines.append(f"Runs reaching DENY_FINAL: {n_deny} of {n_ok}")
+    if first_denies:
+        lines.append(f"First Deny row_index: min={min(first_denies)}  max={max(first_denies)}")
+    else:
+        lines.append("First Deny row_index: (not reached)")
     lines.append("")
     lines.append("Outputs:")
     lines.append(f" - {out_csv}")
     lines.append(f" - {out_txt}")
+    p3_name = compressed_name("phase3_classification.csv", args.compress)
+    lines.append(f" - {run_dir}{os.sep}<run>{os.sep}{p3_name}, phase3_summary.txt")
 
     with open(out_txt, "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
 
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in_csv", required=True, nargs="+",
+                    help="Input CSV from a Phase-II run (disp_sweep/multifsc/cyclic). Several files, directories "
+                         "or glob patterns switch to batch mode: every Phase II CSV found is classified.")
+    ap.add_argument("--out_dir", default="ssb_phase3_out", help="Output directory.")
+    ap.add_argument("--case_id", default="PHASE3", help="Case label.")
+    ap.add_argument("--tag", default="PHASE3_ENVELOPE", help="Run tag.")
+
+    # These must match the run's declared thresholds (from the report)
+    ap.add_argument("--a_min", type=float, default=0.70, help="Minimum permission threshold used in Phase-II.")
+    ap.add_argument("--s_max", type=float, default=1.00, help="Max resistance used in Phase-II.")
+    ap.add_argument("--s_warn_frac", type=float, default=0.80, help="Restricted envelope starts at this fraction of s_max.")
+    ap.add_argument("--cache_dir", default="",
+                    help="Optional result cache. Identical inputs + code reuse the cached artifacts.")
+    ap.add_argument("--cache_max_mb", type=float, default=0.0,
+                    help="Cache size limit in MB (LRU eviction; 0 = unlimited).")
+    ap.add_argument("--compress", default="none", choices=list(COMPRESS_EXT),
+                    help="Write phase3_classification.csv as .csv.gz / .csv.zst, compressed on a background thread. "
+                         "Compressed inputs are always read transparently.")
+    ap.add_argument("--catalog", default="", help="Optional SQLite run catalog to register this run in.")
+    ap.add_argument("--workers", type=int, default=1, help="Batch mode worker processes.")
+    ap.add_argument("--max_in_flight", type=int, default=0,
+                    help="Batch mode: most files submitted to the pool at once (0 = 2 x workers).")
+
+    args = ap.parse_args(argv)
+
+    batch = len(args.in_csv) > 1 or any(glob.has_magic(p) or os.path.isdir(p) for p in args.in_csv)
+    if batch:
+        in_csvs = discover_inputs(args.in_csv)
+        if not in_csvs:
+            raise SystemExit("No Phase II CSVs found (" + ", ".join(PHASE2_CSVS) + ").")
+        os.makedirs(args.out_dir, exist_ok=True)
+        run_dir = safe_run_dir(args.out_dir, args.case_id, args.tag)
+        if not run_batch(args, run_dir, in_csvs):
+            raise SystemExit(1)
+        return
+    args.in_csv = args.in_csv[0]
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    run_dir = safe_run_dir(args.out_dir, args.case_id, args.tag)
+
+    if args.cache_dir:
+        from ssb_cache import cache_fetch, cache_key, code_version, file_digest
+
+        # Keyed on the input CSV content, not its path
+        params = dict(vars(args), in_csv=file_digest(args.in_csv))
+        cache_id = cache_key("phase3", params, code_version(CODE_FILES))
+        if cache_fetch(args.cache_dir, cache_id, run_dir, {"input_csv": args.in_csv}):
+            if args.catalog:
+                from ssb_catalog import record_from_run_dir, register_run
+
+                register_run(args.catalog, record_from_run_dir(run_dir))
+            return
+
+    out_csv = compressed_name(os.path.join(run_dir, "phase3_classification.csv"), args.compress)
+    out_txt = os.path.join(run_dir, "phase3_summary.txt")
+
+    tally = classify_csv(args.in_csv, out_csv, args.a_min, args.s_max, args.s_warn_frac)
+
+    write_summary(out_txt, args.in_csv, args.a_min, args.s_max, args.s_warn_frac, tally, out_csv)
+
+    if args.catalog:
+        from ssb_catalog import record_from_run_dir, register_run
+
+        # Phase III only sees the input CSV; parameters come from its columns and the summary
+        register_run(args.catalog, record_from_run_dir(run_dir))
+
+    if args.cache_dir:
+        from ssb_cache import cache_store
+
+        cache_store(args.cache_dir, cache_id, run_dir, args.cache_max_mb, {"input_csv": args.in_csv})
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+SSB analytic sensitivities (exact partial derivatives, no re-runs).
+
+Inputs:  I_T, disp_vol, KB, KG, FSC
+Outputs: GM_eff, margin, a, r, s
+
+  GM_eff = KB + I_T/disp_vol - KG - FSC
+  margin = GM_eff / GM_safe
+  a      = clamp01(margin)           -> d(a)  = d(margin) if 0 <= margin <= 1 else 0
+  r      = max(0, 1 - margin)        -> d(r)  = -d(margin) if margin < 1 else 0
+  s      = s_old + max(0, r - r_safe) -> d(s) = d(s_old) + (d(r) if r > r_safe else 0)
+
+At the kinks (margin exactly 0 or 1, r exactly r_safe) the derivative taken is
+the one of the branch the gate itself evaluates.
+
+d(s)/dx is the derivative of the accumulated s with respect to a shift of x
+applied to every row so far (e.g. a different KG for the whole run, or a
+shifted disp_start / FSC_total).
+"""
+
+import math
+
+EPS = 1e-12
+
+SENS_INPUTS = ["I_T", "disp_vol", "KB", "KG", "FSC"]
+SENS_OUTPUTS = ["GM_eff", "margin", "a", "r", "s"]
+
+def sens_header():
+    return [f"d{o}_d{x}" for o in SENS_OUTPUTS for x in SENS_INPUTS]
+
+def gm_eff_partials(I_T, disp_vol):
+    # [dGM_eff/dI_T, dGM_eff/ddisp_vol, dGM_eff/dKB, dGM_eff/dKG, dGM_eff/dFSC]
+    return [1.0 / disp_vol, -I_T / (disp_vol * disp_vol), 1.0, -1.0, -1.0]
+
+def gate_partials(dGM, GM_eff, GM_safe, r_safe, ds_old):
+    # Returns (dmargin, da, dr, ds) lists, one entry per input.
+    g = max(GM_safe, EPS)
+    margin = GM_eff / g
+    r = max(0.0, 1.0 - margin)
+
+    dmargin = [d / g for d in dGM]
+    da = [d if 0.0 <= margin <= 1.0 else 0.0 for d in dmargin]
+    dr = [-d if margin < 1.0 else 0.0 for d in dmargin]
+    ds = [s0 + (d if r > r_safe else 0.0) for s0, d in zip(ds_old, dr)]
+    return dmargin, da, dr, ds
+
+def nan_partials():
+    return [float("nan")] * len(SENS_INPUTS)
+
+def tornado(x_vals, dmargin):
+    # Rank inputs by elasticity |x * dmargin/dx| (largest first).
+    ranked = []
+    for name, x, d in zip(SENS_INPUTS, x_vals, dmargin):
+        e = abs(x * d)
+        ranked.append((name, x, d, e if math.isfinite(e) else -1.0))
+    ranked.sort(key=lambda t: -t[3])
+    return ranked
+
+def tornado_lines(where, x_vals, dmargin, ds):
+    lines = []
+    lines.append(f"Sensitivity tornado at {where} (elasticity = |x * dmargin/dx|):")
+    ds_by_name = dict(zip(SENS_INPUTS, ds))
+    for k, (name, x, d, e) in enumerate(tornado(x_vals, dmargin), 1):
+        e_txt = "nan" if e < 0.0 else f"{e:.6f}"
+        lines.append(f" {k}. {name:<8} x={x:.6f}  dmargin/dx={d:.6f}  elasticity={e_txt}  ds/dx={ds_by_name[name]:.6f}")
+    return lines
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+SSB shared-memory float64 tables for process-parallel evaluation.
+
+A table is one multiprocessing.shared_memory block of n_rows x n_cols float64
+values, row-major. The parent creates it and fills the inputs; workers attach
+by name and read / write their own row slices in place. Only the descriptor
+(name, n_rows, n_cols) is pickled to a worker, and nothing but None comes
+back, so the data exists once no matter how many processes share it.
+
+  with SharedTable(n_rows, n_cols) as tab:          # parent: create
+      tab.view[i * n_cols + j] = x
+      ex.map(worker, [(tab.descriptor(), lo, hi), ...])
+
+  def worker(job):
+      desc, lo, hi = job
+      with SharedTable.attach(desc) as tab:         # worker: attach
+          ...
+
+The parent (the creator) unlinks the block on exit; workers only close it.
+"""
+
+from multiprocessing import shared_memory
+
+ITEM_BYTES = 8
+
+def _attach(name):
+    # Workers must not register the block with their own resource tracker,
+    # or it could be unlinked while the parent still owns it (Python 3.13+).
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+class SharedTable:
+    # n_rows x n_cols float64 values in shared memory; view is a flat memoryview ("d").
+
+    def __init__(self, n_rows, n_cols, name=None):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.owner = name is None
+        if self.owner:
+            # Zero-size blocks are not allowed; keep one spare item
+            size = max(1, n_rows * n_cols) * ITEM_BYTES
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = _attach(name)
+        self._items = self.shm.buf.cast("d")
+        self.view = self._items[:n_rows * n_cols]
+
+    @classmethod
+    def attach(cls, desc):
+        name, n_rows, n_cols = desc
+        return cls(n_rows, n_cols, name=name)
+
+    def descriptor(self):
+        return (self.shm.name, self.n_rows, self.n_cols)
+
+    def close(self):
+        if self.view is None:
+            return
+        # Every exported memoryview must be released before the block can close
+        self.view.release()
+        self._items.release()
+        self.view = self._items = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
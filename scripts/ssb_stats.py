@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+SSB cross-run statistics (streaming, bounded memory, mergeable).
+
+Commands:
+  reduce  scan run folders under one or more roots and aggregate them
+  merge   combine partial results saved with --out_json
+
+Each run is reduced to one record while its CSV is streamed (the catalog's
+scanners; see ssb_catalog.record_from_run_dir), so no run is ever held in
+memory. Records are grouped by --group_by (e.g. mode,amp or KG) and fed into,
+per group and metric:
+
+  counts    runs, runs reaching DENY (exact integers)
+  sketch    log-bucketed quantile sketch: bucket i holds values in
+            (gamma^(i-1), gamma^i] with gamma = (1+alpha)/(1-alpha), so every
+            reported quantile is within relative error alpha of a true sample
+            value. At most --max_bins buckets per sign are kept (the smallest
+            magnitudes are folded together beyond that).
+
+Sketches merge by adding bucket counts, and the running sum for the mean is
+an exact Fraction, so shards reduced on different processes or machines give
+the same table, bit for bit, as a single serial pass.
+
+Metrics:
+  first_deny     first DENY row index (tick t for cyclic, j / i for sweeps)
+  first_deny_x   swept value at that row (disp_vol, FSC_total or t)
+  final_s        accumulated s at the last row
+  n_restricted   rows in ALLOW_RESTRICTED_MONITOR (needs Phase III output)
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+from fractions import Fraction
+
+METRICS = ["first_deny", "first_deny_x", "final_s", "n_restricted"]
+
+DEFAULT_ALPHA = 0.01
+DEFAULT_MAX_BINS = 2048
+DEFAULT_QUANTILES = "0.05,0.25,0.5,0.75,0.95"
+
+# Values closer to zero than this are counted in the zero bucket
+ZERO_EPS = 1e-12
+
+# --- Quantile sketch ---
+
+def new_sketch(alpha=DEFAULT_ALPHA, max_bins=DEFAULT_MAX_BINS):
+    return {
+        "alpha": alpha, "max_bins": max_bins,
+        "n": 0, "zero": 0, "pos": {}, "neg": {},
+        "min": math.inf, "max": -math.inf, "sum": Fraction(0),
+    }
+
+def sketch_gamma(sk):
+    return (1.0 + sk["alpha"]) / (1.0 - sk["alpha"])
+
+def collapse(store, max_bins):
+    # Fold the smallest-magnitude buckets into the first one that is kept.
+    if len(store) <= max_bins:
+        return
+    keys = sorted(store)
+    excess = len(keys) - max_bins
+    keep = keys[excess]
+    for k in keys[:excess]:
+        store[keep] += store.pop(k)
+
+def sketch_add(sk, x):
+    if not (isinstance(x, (int, float)) and math.isfinite(x)):
+        return
+    sk["n"] += 1
+    sk["sum"] += Fraction(x)
+    sk["min"] = min(sk["min"], x)
+    sk["max"] = max(sk["max"], x)
+    if abs(x) < ZERO_EPS:
+        sk["zero"] += 1
+        return
+    store = sk["pos"] if x > 0.0 else sk["neg"]
+    i = math.ceil(math.log(abs(x)) / math.log(sketch_gamma(sk)))
+    store[i] = store.get(i, 0) + 1
+    collapse(store, sk["max_bins"])
+
+def sketch_merge(sk, part):
+    if part["alpha"] != sk["alpha"]:
+        raise SystemExit(f"Cannot merge sketches with different alpha ({sk['alpha']} vs {part['alpha']}).")
+    sk["n"] += part["n"]
+    sk["zero"] += part["zero"]
+    sk["sum"] += part["sum"]
+    sk["min"] = min(sk["min"], part["min"])
+    sk["max"] = max(sk["max"], part["max"])
+    for side in ("pos", "neg"):
+        store = sk[side]
+        for i, c in part[side].items():
+            store[i] = store.get(i, 0) + c
+        collapse(store, sk["max_bins"])
+
+def sketch_quantile(sk, q):
+    if sk["n"] == 0:
+        return float("nan")
+    gamma = sketch_gamma(sk)
+    rank = q * (sk["n"] - 1)
+    seen = 0
+
+    def value(i):
+        return 2.0 * gamma ** i / (gamma + 1.0)
+
+    # Ascending order: most negative, zeros, then positives (clamped to the exact min / max)
+    for i in sorted(sk["neg"], reverse=True):
+        seen += sk["neg"][i]
+        if seen > rank:
+            return min(sk["max"], max(sk["min"], -value(i)))
+    seen += sk["zero"]
+    if seen > rank:
+        return 0.0
+    for i in sorted(sk["pos"]):
+        seen += sk["pos"][i]
+        if seen > rank:
+            return min(sk["max"], max(sk["min"], value(i)))
+    return sk["max"]
+
+# --- Grouped reduction ---
+
+def new_group():
+    return {"runs": 0, "runs_deny": 0, "sketches": {}}
+
+def group_key(rec, group_by):
+    key = []
+    for g in group_by:
+        v = rec.get(g)
+        key.append("" if v is None else str(v))
+    return "\t".join(key)
+
+def reduce_record(partial, rec, group_by, alpha, max_bins):
+    grp = partial.setdefault(group_key(rec, group_by), new_group())
+    grp["runs"] += 1
+    if rec.get("first_deny") is not None:
+        grp["runs_deny"] += 1
+    for m in METRICS:
+        v = rec.get(m)
+        if v is None:
+            continue
+        sk = grp["sketches"].get(m)
+        if sk is None:
+            sk = grp["sketches"][m] = new_sketch(alpha, max_bins)
+        sketch_add(sk, v)
+
+def merge_partial(partial, part):
+    for key, g in part.items():
+        grp = partial.setdefault(key, new_group())
+        grp["runs"] += g["runs"]
+        grp["runs_deny"] += g["runs_deny"]
+        for m, sk in g["sketches"].items():
+            if m in grp["sketches"]:
+                sketch_merge(grp["sketches"][m], sk)
+            else:
+                grp["sketches"][m] = sk
+
+def reduce_shard(job):
+    # Runs in a worker process: one partial result for a list of run folders.
+    from ssb_catalog import record_from_run_dir
+
+    run_dirs, family, group_by, alpha, max_bins = job
+    partial = {}
+    for run_dir in run_dirs:
+        rec = record_from_run_dir(run_dir)
+        if rec is None or (family and rec["family"] != family):
+            continue
+        reduce_record(partial, rec, group_by, alpha, max_bins)
+    return partial
+
+def reduce_runs(roots, family, group_by, alpha, max_bins, workers):
+    from ssb_catalog import iter_run_dirs
+
+    run_dirs = list(iter_run_dirs(roots))
+    n_shards = max(1, min(len(run_dirs), 4 * workers))
+    jobs = [(run_dirs[k::n_shards], family, group_by, alpha, max_bins) for k in range(n_shards)]
+
+    partial = {}
+    if workers <= 1:
+        for job in jobs:
+            merge_partial(partial, reduce_shard(job))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            # map() yields in shard order, so the merge order is fixed
+            for part in ex.map(reduce_shard, jobs):
+                merge_partial(partial, part)
+    return partial
+
+# --- Partial results on disk (JSON) ---
+
+def save_partial(path, partial, group_by):
+    # Fractions are stored as "num/den" strings
+    groups = {key: dict(g, sketches={m: dict(sk, sum=str(sk["sum"])) for m, sk in g["sketches"].items()})
+              for key, g in partial.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"group_by": group_by, "groups": groups}, f, sort_keys=True)
+
+def load_partial(path):
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    for g in doc["groups"].values():
+        for sk in g["sketches"].values():
+            # JSON object keys are strings; bucket indices are ints
+            sk["pos"] = {int(i): c for i, c in sk["pos"].items()}
+            sk["neg"] = {int(i): c for i, c in sk["neg"].items()}
+            sk["sum"] = Fraction(sk["sum"])
+    return doc["group_by"], doc["groups"]
+
+# --- Output ---
+
+def write_table(out, partial, group_by, quantiles):
+    w = csv.writer(out)
+    qcols = ["p" + format(q * 100, "g") for q in quantiles]
+    w.writerow(group_by + ["runs", "runs_deny", "metric", "n", "mean", "min"] + qcols + ["max"])
+    for key in sorted(partial):
+        g = partial[key]
+        gvals = key.split("\t") if group_by else []
+        for m in METRICS:
+            sk = g["sketches"].get(m)
+            if sk is None or sk["n"] == 0:
+                continue
+            qs = [sketch_quantile(sk, q) for q in quantiles]
+            w.writerow(gvals + [g["runs"], g["runs_deny"], m, sk["n"], float(sk["sum"] / sk["n"]), sk["min"]] + qs + [sk["max"]])
+
+def parse_list(s):
+    return [x.strip() for x in s.split(",") if x.strip()]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SSB cross-run statistics (streaming quantile sketches).")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("reduce", help="Aggregate run folders.")
+    r.add_argument("roots", nargs="+", help="Folders to scan (e.g. outputs/ssb_cyclic_out).")
+    r.add_argument("--group_by", default="", help="Comma-separated catalog fields, e.g. mode,amp or KG.")
+    r.add_argument("--family", default="", help="Only this family: disp_sweep | multifsc | cyclic | cyclic_fleet | phase3")
+    r.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Relative accuracy of the quantiles.")
+    r.add_argument("--max_bins", type=int, default=DEFAULT_MAX_BINS, help="Sketch buckets kept per sign.")
+    r.add_argument("--workers", type=int, default=1, help="Worker processes (run folders are sharded).")
+
+    m = sub.add_parser("merge", help="Merge partial results saved with --out_json.")
+    m.add_argument("partials", nargs="+", help="JSON files from reduce/merge --out_json.")
+
+    for p in (r, m):
+        p.add_argument("--quantiles", default=DEFAULT_QUANTILES, help="Comma-separated quantiles to report.")
+        p.add_argument("--out_json", default="", help="Also save the mergeable partial result here.")
+        p.add_argument("--out_csv", default="", help="Write the table here instead of stdout.")
+
+    args = ap.parse_args(argv)
+    quantiles = [float(q) for q in parse_list(args.quantiles)]
+    if any(not (0.0 <= q <= 1.0) for q in quantiles):
+        raise SystemExit("quantiles must be in [0, 1].")
+
+    if args.cmd == "reduce":
+        if not (0.0 < args.alpha < 1.0):
+            raise SystemExit("alpha must be in (0, 1).")
+        group_by = parse_list(args.group_by)
+        partial = reduce_runs(args.roots, args.family, group_by, args.alpha, max(1, args.max_bins), args.workers)
+    else:
+        group_by, partial = load_partial(args.partials[0])
+        for path in args.partials[1:]:
+            gb, part = load_partial(path)
+            if gb != group_by:
+                raise SystemExit(f"{path} is grouped by {gb}, expected {group_by}.")
+            merge_partial(partial, part)
+
+    if args.out_json:
+        save_partial(args.out_json, partial, group_by)
+
+    if args.out_csv:
+        with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+            write_table(f, partial, group_by, quantiles)
+    else:
+        write_table(sys.stdout, partial, group_by, quantiles)
+
+if __name__ == "__main__":
+    main()